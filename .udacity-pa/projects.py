@@ -7,7 +7,8 @@ nanodegree = 'nd889'
 projects = ['sudoku']
 
 def submit(args):
-  filenames = ['solution.py', 'README.md']
+  filenames = ['solution.py', 'bitboard.py', 'dlx.py', 'heuristics.py',
+               'parallel.py', 'topology.py', 'README.md']
 
   udacity.submit(nanodegree, projects[0], filenames, 
                  environment = args.environment,
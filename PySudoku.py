@@ -1,58 +1,109 @@
 import sys, os, random, pygame
-sys.path.append(os.path.join("objects"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "objects"))
 import SudokuSquare
 from GameResources import *
 
 digits = '123456789'
 rows = 'ABCDEFGHI'
 
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+SOLVED_COLOR = (2, 204, 186)
+OPEN_COLOR = (255, 255, 255)
 
-def play(values_list):
+
+def square_origin(x, y):
+    """Top left corner of the square in column x, row y of the board image."""
+    if x in (0, 1, 2):  startX = (x * 57) + 38
+    if x in (3, 4, 5):  startX = (x * 57) + 99
+    if x in (6, 7, 8):  startX = (x * 57) + 159
+
+    if y in (0, 1, 2):  startY = (y * 57) + 35
+    if y in (3, 4, 5):  startY = (y * 57) + 100
+    if y in (6, 7, 8):  startY = (y * 57) + 165
+    return startX, startY
+
+
+class BoardRenderer:
+    """Draws boards in dictionary form onto a surface, one square at a time.
+
+    The two rounded tiles and the nine digit glyphs are rendered once and
+    reused, and each render only redraws the squares whose digit changed
+    since the previous one, returning their rectangles for
+    pygame.display.update.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.background = pygame.image.load(os.path.join(IMAGE_DIR, "sudoku-board-bare.jpg")).convert()
+        self.font = pygame.font.SysFont('opensans', 21)
+        self.tiles = {}
+        for color in (SOLVED_COLOR, OPEN_COLOR):
+            tile = pygame.Surface((45, 40), pygame.SRCALPHA)
+            SudokuSquare.AAfilledRoundedRect(tile, (0, 0, 45, 40), color)
+            self.tiles[color] = tile
+        self.glyphs = {digit: self.font.render(digit, 1, (255, 255, 255)) for digit in digits}
+        self.squares = {}
+        for y in range(9):
+            for x in range(9):
+                self.squares[rows[y] + digits[x]] = pygame.Rect(square_origin(x, y), (45, 40))
+        self.shown = None
+
+    def render(self, values):
+        """Draw values and return the rectangles that changed."""
+        full = self.shown is None
+        if full:
+            self.screen.blit(self.background, (0, 0))
+            self.shown = dict.fromkeys(self.squares)
+        dirty = []
+        for box, rect in self.squares.items():
+            digit = values[box] if len(values[box]) == 1 and values[box] in digits else ''
+            if digit == self.shown[box]:
+                continue
+            self.shown[box] = digit
+            self.screen.blit(self.background, rect, rect)
+            self.screen.blit(self.tiles[SOLVED_COLOR if digit else OPEN_COLOR], rect)
+            if digit:
+                self.screen.blit(self.glyphs[digit], rect.move(17, 4))
+            dirty.append(rect)
+        return [self.screen.get_rect()] if full else dirty
+
+
+def play(values_list, output_dir=None, fps=5, image_format='png'):
+    """Show each board of values_list in turn.
+
+    With output_dir, nothing is shown: pygame runs on the SDL dummy video
+    driver, each frame is saved as output_dir/frame_00000.png and so on,
+    and the number of frames written is returned once they are done.
+    Encoding a PNG takes far longer than drawing the frame, so pass
+    image_format='bmp' (or 'tga') when export speed matters.
+    """
+    if output_dir is not None:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.makedirs(output_dir, exist_ok=True)
     pygame.init()
 
 
     size = width, height = 700, 700
     screen = pygame.display.set_mode(size)
-
-    background_image = pygame.image.load("./images/sudoku-board-bare.jpg").convert()
+    renderer = BoardRenderer(screen)
 
     clock = pygame.time.Clock()
 
-    # The puzzleNumber sets a seed so either generate
-    # a random number to fill in here or accept user
-    # input for a duplicatable puzzle.
-
+    frames = 0
     for values in values_list:
         pygame.event.pump()
-        theSquares = []
-        initXLoc = 0
-        initYLoc = 0
-        startX, startY, editable, number = 0, 0, "N", 0
-        for y in range(9):
-            for x in range(9):
-                if x in (0, 1, 2):  startX = (x * 57) + 38
-                if x in (3, 4, 5):  startX = (x * 57) + 99
-                if x in (6, 7, 8):  startX = (x * 57) + 159
-
-                if y in (0, 1, 2):  startY = (y * 57) + 35
-                if y in (3, 4, 5):  startY = (y * 57) + 100
-                if y in (6, 7, 8):  startY = (y * 57) + 165
-                col = digits[x]
-                row = rows[y]
-                string_number = values[row + col]
-                if len(string_number) > 1 or string_number == '' or string_number == '.':
-                    number = None
-                else:
-                    number = int(string_number)
-                theSquares.append(SudokuSquare.SudokuSquare(number, startX, startY, editable, x, y))
-
-        screen.blit(background_image, (0, 0))
-        for num in theSquares:
-            num.draw()
-
-        pygame.display.flip()
-        pygame.display.update()
-        clock.tick(5)
+        dirty = renderer.render(values)
+        if output_dir is not None:
+            name = "frame_{:05d}.{}".format(frames, image_format)
+            pygame.image.save(screen, os.path.join(output_dir, name))
+        else:
+            pygame.display.update(dirty)
+            clock.tick(fps)
+        frames += 1
+
+    if output_dir is not None:
+        pygame.quit()
+        return frames
 
     # leave game showing until closed by user
     while True:
@@ -63,4 +114,4 @@ def play(values_list):
 
 if __name__ == "__main__":
     main()
-    sys.exit()
\ No newline at end of file
+    sys.exit()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+import solution
+import solution_test
+
+try:
+    import pygame
+    import PySudoku
+except ImportError:
+    PySudoku = None
+
+
+@unittest.skipIf(PySudoku is None, "pygame is not installed")
+class TestHeadless(unittest.TestCase):
+    grid = solution_test.TestDiagonalSudoku.diagonal_grid
+
+    def frames(self):
+        trace = solution.Trace()
+        solution.solve(self.grid, engine='dict', trace=trace)
+        return list(trace.frames())
+
+    def test_writes_frames(self):
+        frames = self.frames()
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(PySudoku.play(frames, output_dir=directory, image_format='bmp'), len(frames))
+            self.assertEqual(sorted(os.listdir(directory))[-1], 'frame_{:05d}.bmp'.format(len(frames) - 1))
+
+    def test_redraws_changed_squares(self):
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        pygame.init()
+        try:
+            renderer = PySudoku.BoardRenderer(pygame.display.set_mode((700, 700)))
+            values = solution.grid_values(self.grid)
+            self.assertEqual(renderer.render(values), [pygame.Rect(0, 0, 700, 700)])
+            self.assertEqual(renderer.render(values), [])
+            values['A2'] = '6'
+            self.assertEqual(renderer.render(values), [renderer.squares['A2']])
+        finally:
+            pygame.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
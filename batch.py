@@ -0,0 +1,76 @@
+"""Solve many sudoku grids across a pool of worker processes."""
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+import solution
+
+
+def _solve_indexed(item):
+    index, grid = item
+    return index, solution.solve(grid)
+
+
+def _run_chunk(func, chunk):
+    return [func(item) for item in chunk]
+
+
+def map_bounded(pool, func, items, chunksize=1, max_pending=16):
+    """Like pool.imap, but reads items only as fast as results are consumed.
+
+    Pool.imap pulls its whole input into the task queue up front. Here at
+    most max_pending chunks of chunksize items are in flight at a time,
+    so an endless or very large input is mapped in constant memory.
+    Results come back in input order.
+    """
+    items = iter(items)
+    pending = deque()
+    while True:
+        while len(pending) < max_pending:
+            chunk = list(islice(items, chunksize))
+            if not chunk:
+                break
+            pending.append(pool.apply_async(_run_chunk, (func, chunk)))
+        if not pending:
+            return
+        for result in pending.popleft().get():
+            yield result
+
+
+def solve_many(grids, workers=None, chunksize=1, ordered=True, max_pending=None):
+    """Solve grids in parallel, yielding each result as it becomes available.
+
+    Each worker process solves its grids with the bitmask engine, which keeps
+    no module-level state, so nothing is shared or recorded between solves.
+
+    Args:
+        grids: iterable of grid strings.
+        workers: number of processes; None uses every core, 1 solves in
+            this process without a pool.
+        chunksize: grids handed to a worker at a time. Larger chunks cut
+            inter-process overhead when there are many easy grids.
+        ordered: when True yield solutions in input order; otherwise yield
+            (index, solution) pairs as soon as each grid finishes.
+        max_pending: when set, read at most this many chunks ahead of the
+            results consumed so far (ordered results only).
+    Yields:
+        The dictionary form of each solved grid, or False if it has no
+        solution.
+    """
+    if workers == 1:
+        for index, grid in enumerate(grids):
+            values = solution.solve(grid)
+            yield values if ordered else (index, values)
+        return
+
+    with Pool(workers) as pool:
+        if ordered and max_pending is not None:
+            results = map_bounded(pool, _solve_indexed, enumerate(grids), chunksize, max_pending)
+            for _, values in results:
+                yield values
+        elif ordered:
+            for _, values in pool.imap(_solve_indexed, enumerate(grids), chunksize):
+                yield values
+        else:
+            for result in pool.imap_unordered(_solve_indexed, enumerate(grids), chunksize):
+                yield result
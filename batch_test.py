@@ -0,0 +1,24 @@
+import unittest
+
+import batch
+import solution_test
+
+
+class TestSolveMany(unittest.TestCase):
+    diagonal = solution_test.TestDiagonalSudoku
+    grids = [diagonal.diagonal_grid, '11' + '.' * 79, diagonal.diagonal_grid]
+    expected = [diagonal.solved_diag_sudoku, False, diagonal.solved_diag_sudoku]
+
+    def test_in_order(self):
+        self.assertEqual(list(batch.solve_many(self.grids, workers=2)), self.expected)
+
+    def test_unordered(self):
+        results = dict(batch.solve_many(self.grids, workers=2, ordered=False))
+        self.assertEqual([results[i] for i in range(len(self.grids))], self.expected)
+
+    def test_single_worker(self):
+        self.assertEqual(list(batch.solve_many(self.grids, workers=1)), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
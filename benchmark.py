@@ -0,0 +1,293 @@
+"""Benchmark the solver engines on the stored puzzle corpus.
+
+Usage:
+    python benchmark.py --output run.json
+    python benchmark.py --engines bitmask dlx --compare run.json
+
+The corpus lives in corpus/<category>.txt, one diagonal puzzle per line:
+easy (34 givens), hard (18 givens, the slowest 20 of 400 generated) and
+unsolvable (a unique hard puzzle with one extra given that contradicts its
+solution). For each engine and category the harness reports puzzles per
+second, latency percentiles, search nodes expanded, peak traced memory and
+how many results were wrong. Results can be saved as JSON and compared
+against an earlier run. With --cache it instead times canonical.SolveCache
+hits, on the same grids and on equivalent ones, against solving them.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import bitboard
+import canonical
+import dlx
+import function
+import heuristics
+import solution
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+CATEGORIES = ('easy', 'hard', 'unsolvable')
+
+
+def load_corpus(categories=CATEGORIES, corpus_dir=CORPUS_DIR):
+    """Return {category: [grid, ...]} read from corpus_dir."""
+    corpus = {}
+    for category in categories:
+        with open(os.path.join(corpus_dir, category + '.txt')) as f:
+            corpus[category] = [line.strip() for line in f if line.strip()]
+    return corpus
+
+
+def _counting(module):
+    """Count the calls a recursive module.search makes to itself.
+
+    The dictionary searches recurse through their module-level name, so
+    swapping that name for a counting wrapper counts every node.
+    """
+    original = module.search
+    calls = [0]
+
+    def search(values):
+        calls[0] += 1
+        return original(values)
+    module.search = search
+    return original, calls
+
+
+def run_solution_search(grid):
+    original, calls = _counting(solution)
+    try:
+        values = solution.search(solution.grid_values(grid))
+    finally:
+        solution.search = original
+    return (values or False), calls[0]
+
+
+def run_function_search(grid):
+    original, calls = _counting(function)
+    try:
+        values = function.search(function.grid_values(grid))
+    finally:
+        function.search = original
+    return (values or False), calls[0]
+
+
+def _run_bitmask(grid, **options):
+    # search_limited counts nodes without the per-strategy timers
+    result = bitboard.search_limited(bitboard.from_values(solution.grid_values(grid)), **options)
+    board = result.solution
+    return (bitboard.to_values(board) if board else False), result.stats.nodes
+
+
+def run_bitmask(grid):
+    return _run_bitmask(grid)
+
+
+def run_bitmask_subsets(grid):
+    return _run_bitmask(grid, max_subset=4)
+
+
+def run_bitmask_degree(grid):
+    return _run_bitmask(grid, variable=heuristics.MRVDegree())
+
+
+def run_bitmask_wdeg(grid):
+    return _run_bitmask(grid, variable=heuristics.DomWDeg())
+
+
+def run_bitmask_lcv(grid):
+    return _run_bitmask(grid, value=heuristics.least_constraining)
+
+
+def run_bitmask_degree_lcv(grid):
+    return _run_bitmask(grid, variable=heuristics.MRVDegree(), value=heuristics.least_constraining)
+
+
+def run_dlx(grid):
+    cover = dlx.ExactCover(bitboard.from_values(solution.grid_values(grid)))
+    for picks in cover.solutions():
+        values = dict(zip(solution.BOXES, ['.'] * 81))
+        for box, bit in picks:
+            values[solution.BOXES[box]] = bitboard.MASK_DIGITS[bit]
+        return values, cover.nodes
+    return False, cover.nodes
+
+
+# Each engine maps a grid string to (solution dict or False, nodes expanded)
+ENGINES = {
+    'solution.search': run_solution_search,
+    'function.search': run_function_search,
+    'bitmask': run_bitmask,
+    'bitmask+subsets': run_bitmask_subsets,
+    'bitmask+degree': run_bitmask_degree,
+    'bitmask+wdeg': run_bitmask_wdeg,
+    'bitmask+lcv': run_bitmask_lcv,
+    'bitmask+deg+lcv': run_bitmask_degree_lcv,
+    'dlx': run_dlx,
+}
+
+
+def is_valid_solution(grid, values):
+    """Check that values solves grid: givens kept, every unit complete."""
+    if not values:
+        return False
+    for box, char in zip(solution.BOXES, grid):
+        if char in solution.DIGITS and values[box] != char:
+            return False
+    return all(sorted(values[box] for box in unit) == list(solution.DIGITS)
+               for unit in solution.UNITLIST)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def measure(run, grids, solvable, repeat=1, memory_sample=5):
+    """Time run over grids and return a dict of metrics.
+
+    Peak memory is traced over the first memory_sample grids only, in a
+    separate untimed pass, since tracemalloc slows every allocation.
+    """
+    latencies = []
+    nodes = 0
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for grid in grids:
+            began = time.perf_counter()
+            values, expanded = run(grid)
+            latencies.append(time.perf_counter() - began)
+            nodes += expanded
+            if not (is_valid_solution(grid, values) if solvable else values is False):
+                errors += 1
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for grid in grids[:memory_sample]:
+        run(grid)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    solved = len(grids) * repeat
+    return {
+        'puzzles': solved,
+        'seconds': elapsed,
+        'puzzles_per_sec': solved / elapsed if elapsed else 0.0,
+        'latency_ms': {name: 1000 * percentile(latencies, fraction)
+                       for name, fraction in (('p50', 0.5), ('p90', 0.9),
+                                              ('p99', 0.99), ('max', 1.0))},
+        'nodes': nodes // repeat,
+        'peak_memory_kb': peak / 1024,
+        'errors': errors // repeat,
+    }
+
+
+def benchmark(engines=None, corpus=None, repeat=1):
+    """Return {engine: {category: metrics}} for every engine and category."""
+    engines = list(ENGINES) if engines is None else engines
+    corpus = load_corpus() if corpus is None else corpus
+    results = {}
+    for name in engines:
+        results[name] = {category: measure(ENGINES[name], grids, category != 'unsolvable', repeat)
+                         for category, grids in corpus.items()}
+    return results
+
+
+def equivalent_grid(grid, rng):
+    """Return grid under a random board symmetry and digit relabelling."""
+    digits = list(solution.DIGITS)
+    rng.shuffle(digits)
+    getter = rng.choice(canonical._GETTERS)
+    return ''.join(getter(grid)).translate(str.maketrans(solution.DIGITS, ''.join(digits)))
+
+
+def measure_cache(grids, repeat=3, seed=0):
+    """Time canonical.SolveCache against solution.solve over grids.
+
+    Returns the best of repeat passes, in seconds, for solving every grid,
+    for exact hits on the same grids and for hits on equivalent grids.
+    Each pass gets a cache filled beforehand, untimed, so an equivalent
+    grid is never answered as an exact hit from an earlier pass.
+    """
+    rng = random.Random(seed)
+    equivalent = [equivalent_grid(grid, rng) for grid in grids]
+    timings = {'solve': [], 'exact hits': [], 'equivalent hits': []}
+    for _ in range(repeat):
+        for name, solve, items in (('solve', solution.solve, grids),
+                                   ('exact hits', None, grids),
+                                   ('equivalent hits', None, equivalent)):
+            if solve is None:
+                cache = canonical.SolveCache(maxsize=len(grids))
+                for grid in grids:
+                    cache.solve(grid)
+                solve = cache.solve
+            started = time.perf_counter()
+            for item in items:
+                solve(item)
+            timings[name].append(time.perf_counter() - started)
+    return {name: min(seconds) for name, seconds in timings.items()}
+
+
+def report(results, baseline=None, out=sys.stdout):
+    """Print one line per engine and category, with speedups over baseline."""
+    header = '{:<16} {:<11} {:>10} {:>9} {:>9} {:>9} {:>9} {:>10} {:>6}'
+    out.write(header.format('engine', 'category', 'puzzles/s', 'p50 ms', 'p99 ms',
+                            'max ms', 'nodes', 'peak KB', 'errors') + '\n')
+    row = '{:<16} {:<11} {:>10.1f} {:>9.2f} {:>9.2f} {:>9.2f} {:>9} {:>10.1f} {:>6}'
+    for name, categories in results.items():
+        for category, metrics in categories.items():
+            latency = metrics['latency_ms']
+            line = row.format(name, category, metrics['puzzles_per_sec'], latency['p50'],
+                              latency['p99'], latency['max'], metrics['nodes'],
+                              metrics['peak_memory_kb'], metrics['errors'])
+            old = (baseline or {}).get(name, {}).get(category)
+            if old and old['puzzles_per_sec']:
+                line += '  x{:.2f} vs baseline'.format(metrics['puzzles_per_sec'] / old['puzzles_per_sec'])
+            out.write(line + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sudoku solver engines.")
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), default=None,
+                        help="engines to run (default: all)")
+    parser.add_argument('--categories', nargs='+', choices=CATEGORIES, default=CATEGORIES,
+                        help="corpus categories to run (default: all)")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="timed passes over each category (default 1)")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--cache', action='store_true',
+                        help="time SolveCache hits against solving instead of the engines")
+    args = parser.parse_args(argv)
+
+    if args.cache:
+        for category, grids in load_corpus(args.categories).items():
+            timings = measure_cache(grids, args.repeat)
+            for name, seconds in timings.items():
+                print('{:<11} {:<16} {:>9.2f} ms  x{:.1f} vs solve'.format(
+                    category, name, 1000 * seconds, timings['solve'] / seconds if seconds else 0.0))
+        return 0
+
+    results = benchmark(args.engines, load_corpus(args.categories), args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    report(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'time': time.time(),
+                       'repeat': args.repeat, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+import unittest
+
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_corpus(self):
+        corpus = benchmark.load_corpus()
+        self.assertEqual(set(corpus), set(benchmark.CATEGORIES))
+        self.assertTrue(all(len(grid) == 81 for grids in corpus.values() for grid in grids))
+
+    def test_engines_agree_on_corpus_sample(self):
+        corpus = benchmark.load_corpus()
+        # the dictionary engines take seconds per hard puzzle
+        sample = {'easy': corpus['easy'][:2], 'unsolvable': corpus['unsolvable'][:2]}
+        results = benchmark.benchmark(list(benchmark.ENGINES), sample)
+        for name, categories in results.items():
+            for category, metrics in categories.items():
+                self.assertEqual(metrics['errors'], 0, (name, category))
+                self.assertGreater(metrics['nodes'], 0)
+
+    def test_percentile(self):
+        self.assertEqual(benchmark.percentile([1, 2, 3, 4], 0.5), 2)
+        self.assertEqual(benchmark.percentile([1, 2, 3, 4], 1.0), 4)
+        self.assertEqual(benchmark.percentile([], 0.5), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
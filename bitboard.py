@@ -0,0 +1,740 @@
+"""Bitmask representation of a sudoku board.
+
+A board is a flat list of integers, one per box, indexed in the row-major
+order of its Topology (``solution.BOXES`` on the default 9x9 diagonal
+board). Each integer is a mask where bit ``d - 1`` is set while digit ``d``
+is still a candidate for that box, so removing candidates is a single
+``&=`` instead of building a new string.
+
+Every function takes an optional topology and defaults to the 9x9 board
+with diagonal units; the module-level tables below describe that board.
+"""
+import time
+from collections import namedtuple
+
+from topology import DIAGONAL_9X9
+
+ROWS = 'ABCDEFGHI'
+COLS = DIGITS = '123456789'
+
+BOXES = DIAGONAL_9X9.boxes
+BOX_INDEX = DIAGONAL_9X9.box_index
+
+ALL_DIGITS = DIAGONAL_9X9.all_digits
+DIGIT_MASK = DIAGONAL_9X9.digit_mask
+DIGIT_BITS = DIAGONAL_9X9.digit_bits
+MASK_DIGITS = DIAGONAL_9X9.mask_digits
+BIT_COUNT = DIAGONAL_9X9.bit_count
+
+UNITLIST = DIAGONAL_9X9.unitlist
+UNITS = DIAGONAL_9X9.units
+PEER_SETS = DIAGONAL_9X9.peer_sets
+PEERS = DIAGONAL_9X9.peers
+
+
+def from_values(values, topo=DIAGONAL_9X9):
+    """Convert a sudoku in dictionary form into a list of candidate masks."""
+    digit_mask = topo.digit_mask
+    board = []
+    for box in topo.boxes:
+        mask = 0
+        for digit in values[box]:
+            mask |= digit_mask[digit]
+        board.append(mask)
+    return board
+
+
+def to_values(board, topo=DIAGONAL_9X9):
+    """Convert a list of candidate masks back into dictionary form."""
+    mask_digits = topo.mask_digits
+    return {box: mask_digits[mask] for box, mask in zip(topo.boxes, board)}
+
+
+def from_grid(grid, topo=DIAGONAL_9X9):
+    """Convert a grid string into a list of candidate masks.
+
+    The grid has one character per box, using the topology's digits
+    ('1'-'9', then 'A'-'P') and anything else, usually '.', for an empty
+    box. Whitespace is ignored.
+
+    Raises:
+        ValueError: if the grid does not hold exactly one character per box.
+    """
+    grid = ''.join(grid.split())
+    if len(grid) != topo.cells:
+        raise ValueError("Sudoku grid is an invalid length")
+    digit_mask, all_digits = topo.digit_mask, topo.all_digits
+    return [digit_mask.get(char, all_digits) for char in grid.upper()]
+
+
+def to_grid(board, topo=DIAGONAL_9X9):
+    """Convert a list of candidate masks into a grid string, '.' if unsolved."""
+    mask_digits, bit_count = topo.mask_digits, topo.bit_count
+    return ''.join(mask_digits[mask] if bit_count[mask] == 1 else '.' for mask in board)
+
+
+def remove_from_peers(box, board, topo=DIAGONAL_9X9):
+    """Remove the candidates of a box from its peers' candidates.
+
+    Input: Index of a box, board as a list of masks.
+    Output: The same board after removal.
+    """
+    keep = ~board[box]
+    for peer in topo.peers[box]:
+        board[peer] &= keep
+    return board
+
+
+def eliminate(board, topo=DIAGONAL_9X9):
+    """Eliminate the value of every solved box from the candidates of its peers.
+
+    Args:
+        board: Sudoku as a list of masks.
+    Returns:
+        The same board after eliminating values.
+    """
+    bit_count = topo.bit_count
+    for box in range(topo.cells):
+        if bit_count[board[box]] == 1:
+            board = remove_from_peers(box, board, topo)
+    return board
+
+
+def only_choice(board, topo=DIAGONAL_9X9):
+    """Finalize all digits that only fit in one box of a unit.
+
+    Input: Sudoku as a list of masks.
+    Output: The same board after filling in only choices.
+    """
+    bit_count = topo.bit_count
+    for unit in topo.unitlist:
+        # digits seen in at least one box, and in at least two boxes
+        once = twice = 0
+        for box in unit:
+            mask = board[box]
+            twice |= once & mask
+            once |= mask
+        singles = once & ~twice
+        if not singles:
+            continue
+        for box in unit:
+            hit = board[box] & singles
+            if hit:
+                # a box that is the only place for two digits is a dead end
+                board[box] = hit if bit_count[hit] == 1 else 0
+    return board
+
+
+def naked_twins(board, topo=DIAGONAL_9X9):
+    """Eliminate values using the naked twins strategy.
+
+    Twins are two peers sharing the same two candidates; those candidates
+    are removed from every box that is a peer of both twins.
+
+    Args:
+        board: Sudoku as a list of masks.
+    Returns:
+        The same board with the naked twins eliminated from peers.
+    """
+    bit_count, peers, peer_sets = topo.bit_count, topo.peers, topo.peer_sets
+    actual_twins = [(primary_box, secondary_box)
+                    for primary_box in range(topo.cells)
+                    if bit_count[board[primary_box]] == 2
+                    for secondary_box in peers[primary_box]
+                    if secondary_box > primary_box
+                    and board[secondary_box] == board[primary_box]]
+
+    for twin_0, twin_1 in actual_twins:
+        keep = ~board[twin_0]
+        for peer in peer_sets[twin_0] & peer_sets[twin_1]:
+            board[peer] &= keep
+    return board
+
+
+def unit_only_choice(board, unit, trail=None, topo=DIAGONAL_9X9):
+    """Assign every digit that only fits in one box of the unit.
+
+    Args:
+        board: Sudoku as a list of masks, updated in place.
+        unit: List of box indexes.
+        trail: Optional list receiving a (box, old mask) pair per change.
+    Returns:
+        A list of the boxes whose candidates changed, or None if the unit
+        can no longer hold every digit.
+    """
+    bit_count = topo.bit_count
+    once = twice = 0
+    for box in unit:
+        mask = board[box]
+        twice |= once & mask
+        once |= mask
+    if once != topo.all_digits:
+        return None
+
+    changed = []
+    singles = once & ~twice
+    if singles:
+        for box in unit:
+            mask = board[box]
+            hit = mask & singles
+            if hit and hit != mask:
+                if bit_count[hit] > 1:
+                    return None
+                if trail is not None:
+                    trail.append((box, mask))
+                board[box] = hit
+                changed.append(box)
+    return changed
+
+
+def unit_naked_twins(board, unit, trail=None, topo=DIAGONAL_9X9):
+    """Remove the digits of naked twins in the unit from its other boxes.
+
+    Returns:
+        A list of the boxes whose candidates changed.
+    """
+    bit_count = topo.bit_count
+    changed = []
+    seen = {}
+    for box in unit:
+        mask = board[box]
+        if bit_count[mask] != 2:
+            continue
+        if mask not in seen:
+            seen[mask] = box
+            continue
+        keep = ~mask
+        for other in unit:
+            if other != box and other != seen[mask] and board[other] & mask:
+                if trail is not None:
+                    trail.append((other, board[other]))
+                board[other] &= keep
+                changed.append(other)
+    return changed
+
+
+def unit_rules(board, unit, trail=None, topo=DIAGONAL_9X9):
+    """Apply only choice and then naked twins to the boxes of one unit.
+
+    Returns:
+        A list of the boxes whose candidates changed, or None if the unit
+        can no longer hold every digit.
+    """
+    changed = unit_only_choice(board, unit, trail, topo)
+    if changed is None:
+        return None
+    twins = unit_naked_twins(board, unit, trail, topo)
+    if twins:
+        changed += twins
+    return changed
+
+
+def _subset_groups(masks, limit, bit_count):
+    """Return (indexes, union) for every 2..limit entries of masks whose
+    union has no more bits than there are entries.
+
+    Groups grow in index order and only while their union stays within
+    limit bits, and entries wider than limit are never tried.
+    """
+    small = [(i, mask) for i, mask in enumerate(masks) if bit_count[mask] <= limit]
+    groups = []
+    if len(small) < 2:
+        return groups
+    stack = [(j, (i,), mask) for j, (i, mask) in enumerate(small)]
+    while stack:
+        last, chosen, union = stack.pop()
+        for j in range(last + 1, len(small)):
+            i, mask = small[j]
+            merged = union | mask
+            size = bit_count[merged]
+            if size > limit:
+                continue
+            group = chosen + (i,)
+            if size <= len(group):
+                groups.append((group, merged))
+            elif len(group) < limit:
+                stack.append((j, group, merged))
+    return groups
+
+
+def unit_subsets(board, unit, trail=None, topo=DIAGONAL_9X9, max_size=4):
+    """Apply naked and hidden subsets of 2..max_size boxes in one unit.
+
+    A naked subset is k open boxes holding only k digits between them, which
+    are removed from the unit's other boxes. A hidden subset is k digits that
+    only fit in the same k boxes, which lose every other candidate. Groups
+    are grown from the open boxes' candidate masks (naked) and from the
+    digits' position masks within the unit (hidden), keeping only masks of
+    at most max_size bits. A naked subset of k boxes is a hidden subset of
+    the other open boxes, so sizes beyond half the open boxes are skipped.
+
+    Returns:
+        A list of the boxes whose candidates changed, or None if a group of
+        k boxes holds fewer than k digits or k digits fit in fewer than k
+        boxes. Other contradictions show up as a box left with no
+        candidates.
+    """
+    bit_count = topo.bit_count
+    open_boxes = [box for box in unit if bit_count[board[box]] > 1]
+    limit = min(max_size, len(open_boxes) // 2)
+    changed = []
+    if limit < 2:
+        return changed
+
+    for group, digits in _subset_groups([board[box] for box in open_boxes], limit, bit_count):
+        if bit_count[digits] < len(group):
+            return None
+        keep = ~digits
+        for i, box in enumerate(open_boxes):
+            if i not in group and board[box] & digits:
+                if trail is not None:
+                    trail.append((box, board[box]))
+                board[box] &= keep
+                changed.append(box)
+
+    positions = {}
+    for i, box in enumerate(open_boxes):
+        mask = board[box]
+        while mask:
+            bit = mask & -mask
+            positions[bit] = positions.get(bit, 0) | 1 << i
+            mask ^= bit
+    digits = list(positions)
+    for group, places in _subset_groups(list(positions.values()), limit, bit_count):
+        if bit_count[places] < len(group):
+            return None
+        keep = 0
+        for i in group:
+            keep |= digits[i]
+        for i, box in enumerate(open_boxes):
+            if places >> i & 1 and board[box] & ~keep:
+                if trail is not None:
+                    trail.append((box, board[box]))
+                board[box] &= keep
+                changed.append(box)
+    return changed
+
+
+def _unit_rules_counted(board, unit, trail, topo, stats):
+    # unit_rules, recording calls, time and removed candidates per strategy
+    changed = []
+    for name, strategy in (('only_choice', unit_only_choice),
+                           ('naked_twins', unit_naked_twins)):
+        result = _counted(stats, name, strategy, board, unit, trail, topo)
+        if result is None:
+            return None
+        changed += result
+    return changed
+
+
+def _counted(stats, name, strategy, board, unit, trail, topo, *args):
+    # run one unit strategy, recording its call, time and removed candidates
+    bit_count = topo.bit_count
+    before = sum(bit_count[board[box]] for box in unit)
+    started = time.perf_counter()
+    result = strategy(board, unit, trail, topo, *args)
+    counter = stats.strategy(name)
+    counter.seconds += time.perf_counter() - started
+    counter.calls += 1
+    if result is not None:
+        removed = before - sum(bit_count[board[box]] for box in unit)
+        if removed:
+            counter.hits += 1
+            counter.eliminations += removed
+    return result
+
+
+def propagate(board, queue=None, trail=None, topo=DIAGONAL_9X9, stats=None,
+              max_subset=0, conflicts=None):
+    """Propagate constraints from the boxes in queue until nothing changes.
+
+    A solved box removes its digit from its peers, and any box whose
+    candidates change is queued in turn. Once the queue runs dry the units
+    touched along the way are checked with unit_rules, which may queue
+    more boxes, and once those stall too the same units are checked with
+    unit_subsets. Only boxes and units affected by a change are revisited.
+
+    Args:
+        board: Sudoku as a list of masks, updated in place.
+        queue: Indexes of the boxes that changed; every box when None.
+        trail: Optional list receiving a (box, old mask) pair per change,
+            so the caller can undo the propagation.
+        stats: Optional SearchStats receiving per-strategy counters; timing
+            only happens when it is given.
+        max_subset: Largest naked or hidden subset to look for; below 2
+            skips unit_subsets.
+        conflicts: Optional list receiving the indexes of the units blamed
+            when propagation fails: the units of an emptied box, or the
+            unit a unit rule rejected.
+    Returns:
+        The board, or False if some box or unit ran out of candidates.
+    """
+    bit_count, peers, units, unitlist = topo.bit_count, topo.peers, topo.units, topo.unitlist
+    pending = list(range(topo.cells) if queue is None else queue)
+    queued = bytearray(topo.cells)
+    for box in pending:
+        queued[box] = 1
+    dirty_units = set()
+    # units touched since unit_subsets last looked at them
+    subset_units = set()
+    use_subsets = max_subset >= 2
+
+    while pending or dirty_units or subset_units:
+        while pending:
+            box = pending.pop()
+            queued[box] = 0
+            mask = board[box]
+            if not mask:
+                if conflicts is not None:
+                    conflicts.extend(units[box])
+                return False
+            dirty_units.update(units[box])
+            if bit_count[mask] != 1:
+                continue
+            if stats is not None:
+                started = time.perf_counter()
+                removed = sum(1 for peer in peers[box] if board[peer] & mask)
+            keep = ~mask
+            for peer in peers[box]:
+                if board[peer] & mask:
+                    if trail is not None:
+                        trail.append((peer, board[peer]))
+                    board[peer] &= keep
+                    if not queued[peer]:
+                        queued[peer] = 1
+                        pending.append(peer)
+            if stats is not None:
+                counter = stats.strategy('eliminate')
+                counter.seconds += time.perf_counter() - started
+                counter.calls += 1
+                if removed:
+                    counter.hits += 1
+                    counter.eliminations += removed
+
+        # unit rules only run once peer elimination has stalled
+        while dirty_units and not pending:
+            u = dirty_units.pop()
+            if use_subsets:
+                subset_units.add(u)
+            if stats is None:
+                changed = unit_rules(board, unitlist[u], trail, topo)
+            else:
+                changed = _unit_rules_counted(board, unitlist[u], trail, topo, stats)
+            if changed is None:
+                if conflicts is not None:
+                    conflicts.append(u)
+                return False
+            for box in changed:
+                if not queued[box]:
+                    queued[box] = 1
+                    pending.append(box)
+
+        # subsets only run once the cheaper rules have stalled as well
+        while subset_units and not pending and not dirty_units:
+            u = subset_units.pop()
+            if stats is None:
+                changed = unit_subsets(board, unitlist[u], trail, topo, max_subset)
+            else:
+                changed = _counted(stats, 'subsets', unit_subsets, board, unitlist[u], trail,
+                                   topo, max_subset)
+            if changed is None:
+                if conflicts is not None:
+                    conflicts.append(u)
+                return False
+            for box in changed:
+                if not queued[box]:
+                    queued[box] = 1
+                    pending.append(box)
+    return board
+
+
+def reduce_puzzle(board, topo=DIAGONAL_9X9, max_subset=4):
+    """Propagate constraints from every box of the board.
+
+    Naked and hidden subsets of up to max_subset boxes are applied too.
+
+    Returns the board, or False if some box ran out of candidates.
+    """
+    return propagate(board, topo=topo, max_subset=max_subset)
+
+
+def search(board, queue=None, topo=DIAGONAL_9X9):
+    """Depth-first search with propagation over a list of masks.
+
+    Args:
+        board: Sudoku as a list of masks.
+        queue: Boxes changed since the board was last propagated; every
+            box when None.
+    Returns:
+        The solved board, or False if the board has no solution.
+    """
+    board = propagate(board, queue, topo=topo)
+    if board is False:
+        return False
+
+    # Choose the unfilled box with the fewest candidates, lowest index first
+    bit_count = topo.bit_count
+    box_space = [(bit_count[mask], box) for box, mask in enumerate(board)
+                 if bit_count[mask] > 1]
+    if not box_space:
+        return board
+    _, temp_box = min(box_space)
+
+    candidates = board[temp_box]
+    for bit in topo.digit_bits:
+        if candidates & bit:
+            temp_board = board[:]
+            temp_board[temp_box] = bit
+            attempt = search(temp_board, [temp_box], topo)
+            if attempt:
+                return attempt
+    return False
+
+
+# Outcomes of a limited search
+SOLVED = 'solved'
+UNSOLVABLE = 'unsolvable'
+EXHAUSTED = 'exhausted'
+
+SearchResult = namedtuple('SearchResult', ['status', 'solution', 'stats'])
+
+
+class StrategyStats:
+    """Calls, time spent and candidates removed by one propagation strategy.
+
+    hits counts the calls that removed at least one candidate.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+        self.eliminations = 0
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.calls if self.calls else 0.0
+
+    def as_dict(self):
+        return dict(vars(self), hit_rate=self.hit_rate)
+
+
+class SearchStats:
+    """Counters filled in by the trail search.
+
+    nodes, backtracks (candidate tries undone), max_depth, copies_avoided
+    and peak_trail are always counted. The per-strategy counters in
+    strategies are only filled when the SearchStats is passed in by the
+    caller, so an uninstrumented search pays nothing for them.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        # branches that would each have copied the whole board
+        self.copies_avoided = 0
+        self.peak_trail = 0
+        self.strategies = {}
+
+    def strategy(self, name):
+        """Return the StrategyStats for name, creating it on first use."""
+        counter = self.strategies.get(name)
+        if counter is None:
+            counter = self.strategies[name] = StrategyStats()
+        return counter
+
+    def as_dict(self):
+        """Return the counters as plain data, e.g. for JSON."""
+        counters = dict(vars(self))
+        counters['strategies'] = {name: counter.as_dict()
+                                  for name, counter in self.strategies.items()}
+        return counters
+
+
+def undo(board, trail, mark):
+    """Restore board to its state when trail was mark entries long."""
+    while len(trail) > mark:
+        box, mask = trail.pop()
+        board[box] = mask
+    return board
+
+
+class Search:
+    """Iterative depth-first search over a board with an undo trail.
+
+    The search keeps an explicit stack of (box, untried candidates, trail
+    mark) frames instead of recursing, so it can stop between any two nodes.
+    It stops early once max_nodes nodes have been expanded, once
+    time.monotonic() passes deadline, or once cancel.is_set() is true (a
+    threading.Event or multiprocessing.Event both work). With rng, a
+    random.Random, each box tries its candidates in random order instead of
+    ascending, which is how random filled grids are made. max_subset is
+    passed to propagate at every node; subsets save about a sixth of the
+    nodes on hard puzzles but take longer than those nodes would, so they
+    are off by default.
+
+    variable and value replace the default branching order, fewest
+    candidates first and ascending digits, with the heuristics described
+    in heuristics.py. A variable heuristic object keeps state for one
+    search, so pass a fresh one to every Search.
+
+    After the solutions() generator finishes, status is UNSOLVABLE if the
+    whole tree was explored, EXHAUSTED if a limit stopped it, and SOLVED as
+    soon as one solution has been yielded.
+    """
+
+    def __init__(self, board, max_nodes=None, deadline=None, cancel=None,
+                 stats=None, topo=DIAGONAL_9X9, rng=None, max_subset=0,
+                 variable=None, value=None):
+        self.board = board
+        self.topo = topo
+        self.rng = rng
+        self.max_subset = max_subset
+        self.variable = variable
+        self.value = value
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.cancel = cancel
+        self.stats = stats if stats is not None else SearchStats()
+        # per-strategy counters only when the caller asked for stats
+        self._strategy_stats = stats
+        self.status = None
+
+    def _stopped(self):
+        if self.max_nodes is not None and self.stats.nodes >= self.max_nodes:
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.cancel is not None and self.cancel.is_set()
+
+    def solutions(self):
+        """Yield the board each time it is solved.
+
+        The board is modified in place and changes again once the generator
+        resumes, so callers that keep a solution must copy it.
+        """
+        board, stats, topo = self.board, self.stats, self.topo
+        strategy_stats, max_subset = self._strategy_stats, self.max_subset
+        variable, value = self.variable, self.value
+        open_count = topo.open_count
+        trail = []
+        conflicts = [] if variable is not None else None
+        if propagate(board, None, trail, topo, strategy_stats, max_subset) is False:
+            self.status = self.status or UNSOLVABLE
+            return
+        del trail[:]
+        if variable is not None:
+            variable.attach(board, topo)
+
+        stack = []
+        descend = True
+        while True:
+            if descend:
+                if self._stopped():
+                    self.status = self.status or EXHAUSTED
+                    return
+                stats.nodes += 1
+                stats.peak_trail = max(stats.peak_trail, len(trail))
+                stats.max_depth = max(stats.max_depth, len(stack))
+                if variable is not None:
+                    temp_box = variable.select(board)
+                else:
+                    # Choose the unfilled box with the fewest candidates
+                    counts = [open_count[mask] for mask in board]
+                    fewest = min(counts)
+                    temp_box = counts.index(fewest) if fewest <= topo.size else None
+                if temp_box is None:
+                    self.status = SOLVED
+                    yield board
+                else:
+                    stack.append([temp_box, board[temp_box], len(trail)])
+
+            # Try the next untried candidate of the deepest open box
+            descend = False
+            while stack:
+                frame = stack[-1]
+                temp_box, remaining, mark = frame
+                if len(trail) > mark:
+                    stats.backtracks += 1
+                    undo(board, trail, mark)
+                if not remaining:
+                    stack.pop()
+                    continue
+                if value is not None:
+                    bit = value(board, temp_box, remaining, topo)
+                elif self.rng is None:
+                    bit = remaining & -remaining
+                else:
+                    bit = self.rng.choice([b for b in topo.digit_bits if remaining & b])
+                frame[1] = remaining & ~bit
+                stats.copies_avoided += 1
+                trail.append((temp_box, board[temp_box]))
+                board[temp_box] = bit
+                if propagate(board, [temp_box], trail, topo, strategy_stats,
+                             max_subset, conflicts) is not False:
+                    descend = True
+                    break
+                if conflicts:
+                    variable.failed(conflicts)
+                    del conflicts[:]
+            if not descend:
+                self.status = self.status or UNSOLVABLE
+                return
+
+
+def search_limited(board, max_nodes=None, deadline=None, cancel=None,
+                   stats=None, topo=DIAGONAL_9X9, max_subset=0, variable=None, value=None):
+    """Search for one solution within a node budget, deadline and cancel token.
+
+    Returns:
+        SearchResult(status, solution, stats) where status is SOLVED,
+        UNSOLVABLE or EXHAUSTED and solution is the solved board or None.
+    """
+    engine = Search(board, max_nodes, deadline, cancel, stats, topo, max_subset=max_subset,
+                    variable=variable, value=value)
+    for solved in engine.solutions():
+        return SearchResult(SOLVED, solved, engine.stats)
+    return SearchResult(engine.status, None, engine.stats)
+
+
+def search_trail(board, stats=None, topo=DIAGONAL_9X9, variable=None, value=None):
+    """Depth-first search that backtracks by undoing a trail of changes.
+
+    Every candidate removal is recorded as (box, old mask) on a single
+    trail, and a failed branch is unwound back to where it started rather
+    than searched on a copy of the board.
+
+    Args:
+        board: Sudoku as a list of masks, updated in place.
+        stats: Optional SearchStats to fill in.
+        variable, value: Optional branching heuristics, as for Search.
+    Returns:
+        The solved board, or False if the board has no solution.
+    """
+    result = search_limited(board, stats=stats, topo=topo, variable=variable, value=value)
+    return result.solution if result.status == SOLVED else False
+
+
+def count_solutions(board, limit=None, stats=None, topo=DIAGONAL_9X9):
+    """Count the solutions of a board, stopping once limit have been found.
+
+    Runs the same trail search as search_trail but carries on past the
+    first solution, so checking for a second one costs about one more
+    search of the remaining tree.
+
+    Args:
+        board: Sudoku as a list of masks, modified during the search.
+        limit: stop counting at this many solutions; None counts them all.
+        stats: Optional SearchStats to fill in.
+    Returns:
+        The number of solutions found, at most limit.
+    """
+    count = 0
+    if limit is not None and limit <= 0:
+        return count
+    for _ in Search(board, stats=stats, topo=topo).solutions():
+        count += 1
+        if count == limit:
+            break
+    return count
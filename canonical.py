@@ -0,0 +1,205 @@
+"""Canonical forms of diagonal sudoku grids and a solve cache keyed by them.
+
+Two puzzles are equivalent when one turns into the other by relabelling
+digits and by a board symmetry that keeps every unit a unit, including both
+diagonals. The symmetries used here are generated by transposition, a
+quarter turn, and the row-and-column permutations that mirror each other
+across the centre: swapping rows 1-2 with 8-9, rows 2-3 with 7-8, rows 4
+and 6, and the top band with the bottom band, each applied to the columns
+at the same time.
+
+The canonical form of a grid is the smallest string reachable by one of
+those symmetries followed by relabelling digits in order of first
+appearance, so equivalent puzzles share a canonical form and SolveCache can
+answer any of them from one solve.
+"""
+from collections import OrderedDict
+from operator import itemgetter
+
+import solution
+
+DIGITS = solution.DIGITS
+
+
+def _cell_map(func):
+    # gather permutation: transformed[r * 9 + c] = grid[func(r, c)]
+    return tuple(r * 9 + c for r, c in (func(i // 9, i % 9) for i in range(81)))
+
+
+def _mirrored(p):
+    return lambda r, c: (p[r], p[c])
+
+
+_GENERATORS = [
+    _cell_map(lambda r, c: (c, r)),
+    _cell_map(lambda r, c: (8 - c, r)),
+    _cell_map(_mirrored([1, 0, 2, 3, 4, 5, 6, 8, 7])),
+    _cell_map(_mirrored([0, 2, 1, 3, 4, 5, 7, 6, 8])),
+    _cell_map(_mirrored([0, 1, 2, 5, 4, 3, 6, 7, 8])),
+    _cell_map(_mirrored([6, 7, 8, 3, 4, 5, 0, 1, 2])),
+]
+
+
+def _closure(generators):
+    identity = tuple(range(81))
+    found = {identity}
+    frontier = [identity]
+    while frontier:
+        perm = frontier.pop()
+        for gen in generators:
+            composed = tuple(perm[i] for i in gen)
+            if composed not in found:
+                found.add(composed)
+                frontier.append(composed)
+    return sorted(found)
+
+
+TRANSFORMS = _closure(_GENERATORS)
+INVERSES = [tuple(sorted(range(81), key=perm.__getitem__)) for perm in TRANSFORMS]
+_GETTERS = [itemgetter(*perm) for perm in TRANSFORMS]
+_INVERSE_GETTERS = [itemgetter(*perm) for perm in INVERSES]
+# the box each transform moves to position p, for every position p
+_POSITION_GETTERS = [itemgetter(*(perm[p] for perm in TRANSFORMS)) for p in range(81)]
+
+
+def _normalize(grid):
+    grid = ''.join(grid.split())
+    if len(grid) != 81:
+        raise ValueError("Sudoku grid is an invalid length")
+    return ''.join(char if char in DIGITS else '.' for char in grid)
+
+
+def _relabelling(grid):
+    # original digit -> label, numbering digits by first appearance and
+    # giving any unused digits the remaining labels in order
+    order = list(dict.fromkeys(char for char in grid if char != '.'))
+    order += [digit for digit in DIGITS if digit not in order]
+    return str.maketrans(''.join(order), DIGITS)
+
+
+def canonical_form(grid):
+    """Return (canonical grid, transform index, digit translation table).
+
+    Applying TRANSFORMS[index] and then the translation table to grid gives
+    the canonical grid.
+    """
+    grid = _normalize(grid)
+    # '.' sorts before every digit and relabelling never turns a digit into
+    # '.', so only the transforms with the longest run of leading empty
+    # boxes can give the smallest string
+    candidates = range(len(TRANSFORMS))
+    for getter in _POSITION_GETTERS:
+        column = getter(grid)
+        emptier = [index for index in candidates if column[index] == '.']
+        if not emptier:
+            break
+        candidates = emptier
+    best = None
+    for index in candidates:
+        text = ''.join(_GETTERS[index](grid))
+        candidate = _relabel_below(text, best[0] if best else None)
+        if candidate is not None:
+            best = (candidate, index, _relabelling(text))
+    return best
+
+
+def _relabel_below(text, bound):
+    # relabel text in order of first appearance, giving up as soon as its
+    # prefix is larger than bound; None unless the result is below bound
+    labels = {}
+    out = []
+    below = bound is None
+    for position, char in enumerate(text):
+        if char != '.':
+            label = labels.get(char)
+            if label is None:
+                label = labels[char] = DIGITS[len(labels)]
+            char = label
+        if not below:
+            limit = bound[position]
+            if char > limit:
+                return None
+            below = char < limit
+        out.append(char)
+    return ''.join(out) if below else None
+
+
+def canonicalize(grid):
+    """Return the canonical form of a grid string."""
+    return canonical_form(grid)[0]
+
+
+class SolveCache:
+    """LRU cache of solutions keyed by canonical form, in front of solve().
+
+    A miss solves the canonical grid and stores its solution; a hit maps
+    the stored solution back through the inverse relabelling and the
+    inverse board symmetry of the requested grid. A grid asked for before
+    is answered from a second LRU keyed on the grid itself, without
+    computing its canonical form.
+
+    Args:
+        maxsize: most canonical forms kept; the least recently used one is
+            evicted beyond that.
+        solve: solver taking a grid string and returning the dictionary
+            form or False, solution.solve by default.
+    """
+
+    def __init__(self, maxsize=1024, solve=solution.solve):
+        self.maxsize = maxsize
+        self._solve = solve
+        self._entries = OrderedDict()
+        # solutions in the orientation asked for, by normalized grid
+        self._exact = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def solve(self, grid):
+        """Solve grid, reusing the solution of any equivalent puzzle seen."""
+        grid = _normalize(grid)
+        solved = self._exact.get(grid)
+        if solved is not None:
+            # asked for this exact grid before: no canonical form needed
+            self.hits += 1
+            self._exact.move_to_end(grid)
+            return solved and dict(zip(solution.BOXES, solved))
+        values = self._solve_equivalent(grid)
+        self._exact[grid] = ''.join(values[box] for box in solution.BOXES) if values else False
+        if len(self._exact) > self.maxsize:
+            self._exact.popitem(last=False)
+        return values
+
+    def _solve_equivalent(self, grid):
+        canonical, index, table = canonical_form(grid)
+        if canonical in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(canonical)
+            solved = self._entries[canonical]
+        else:
+            self.misses += 1
+            values = self._solve(canonical)
+            solved = ''.join(values[box] for box in solution.BOXES) if values else False
+            self._entries[canonical] = solved
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        if solved is False:
+            return False
+
+        inverse_table = {label: digit for digit, label in table.items()}
+        original = ''.join(_INVERSE_GETTERS[index](solved.translate(inverse_table)))
+        return dict(zip(solution.BOXES, original))
+
+    def info(self):
+        """Return hit, miss and eviction counts with the current size."""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def clear(self):
+        self._entries.clear()
+        self._exact.clear()
+        self.hits = self.misses = self.evictions = 0
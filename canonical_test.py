@@ -0,0 +1,74 @@
+import random
+import unittest
+
+import benchmark
+import canonical
+import solution
+import solution_test
+
+
+class TestCanonicalForm(unittest.TestCase):
+    grid = solution_test.TestDiagonalSudoku.diagonal_grid
+
+    def equivalent(self, grid, rng):
+        perm = rng.choice(canonical.TRANSFORMS)
+        digits = list(solution.DIGITS)
+        rng.shuffle(digits)
+        return ''.join(grid[i] for i in perm).translate(str.maketrans(solution.DIGITS, ''.join(digits)))
+
+    def test_transforms_keep_units(self):
+        units = {frozenset(solution.BOX_INDEX[box] for box in unit) for unit in solution.UNITLIST}
+        for perm in canonical.TRANSFORMS:
+            self.assertEqual({frozenset(perm[i] for i in unit) for unit in units}, units)
+
+    def test_equivalent_grids_share_form(self):
+        rng = random.Random(3)
+        form = canonical.canonicalize(self.grid)
+        for _ in range(10):
+            self.assertEqual(canonical.canonicalize(self.equivalent(self.grid, rng)), form)
+
+    def test_matches_full_scan(self):
+        # the pruned scan gives the same form as relabelling every transform
+        rng = random.Random(6)
+        grids = benchmark.load_corpus(['easy'])['easy'][:10]
+        grids += [''.join(char if rng.random() < 0.3 else '.' for char in grid) for grid in grids]
+        grids += ['.' * 81, '.' * 80 + '5']
+        for grid in grids:
+            full = min((''.join(getter(grid)).translate(canonical._relabelling(''.join(getter(grid)))),
+                        index) for index, getter in enumerate(canonical._GETTERS))
+            self.assertEqual(canonical.canonical_form(grid)[:2], full)
+
+    def test_cache_maps_hits_back(self):
+        rng = random.Random(4)
+        cache = canonical.SolveCache(maxsize=1)
+        self.assertEqual(cache.solve(self.grid), solution.solve(self.grid))
+        for _ in range(5):
+            grid = self.equivalent(self.grid, rng)
+            self.assertEqual(cache.solve(grid), solution.solve(grid))
+        self.assertEqual((cache.hits, cache.misses), (5, 1))
+
+        cache.solve(solution_test.TestBitboard.sparse_grid)
+        self.assertEqual((cache.misses, cache.evictions, len(cache)), (2, 1, 1))
+
+    def test_hits_skip_the_solver(self):
+        rng = random.Random(7)
+        calls = []
+
+        def solve(grid):
+            calls.append(grid)
+            return solution.solve(grid)
+        grids = benchmark.load_corpus(['easy'])['easy']
+        cache = canonical.SolveCache(solve=solve)
+        for grid in grids:
+            cache.solve(grid)
+        self.assertEqual(len(calls), len(grids))
+        for grid in grids:
+            self.assertTrue(cache.solve(grid))
+        for grid in grids:
+            self.assertTrue(cache.solve(self.equivalent(grid, rng)))
+        self.assertEqual(len(calls), len(grids))
+        self.assertEqual(cache.hits, 2 * len(grids))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""Solve a file of puzzles, one 81-character grid per line.
+
+Usage:
+    python cli.py puzzles.txt > solutions.txt
+    python cli.py - --workers 4 --timeout 5 < puzzles.txt
+
+Each input line produces one output line in the same order: the solved grid
+as 81 digits, UNSOLVABLE, INVALID for a line that is not a grid, or
+TIMEOUT for a puzzle still unsolved after --timeout seconds. Blank
+lines are skipped. Lines are read only as fast as they are solved, so files
+of any size run in constant memory. A throughput summary goes to stderr.
+"""
+import argparse
+import sys
+import time
+from functools import partial
+from multiprocessing import Pool
+
+import batch
+import bitboard
+import solution
+
+UNSOLVABLE = 'UNSOLVABLE'
+INVALID = 'INVALID'
+TIMEOUT = 'TIMEOUT'
+
+
+def solve_line(line, deadline=None):
+    """Solve one puzzle line and return the output line, without newline.
+
+    The search is the one solve() runs. With a time.monotonic() deadline,
+    a puzzle still unsolved by then gives TIMEOUT.
+    """
+    grid = ''.join(line.split())
+    if len(grid) != 81:
+        return INVALID
+    result = solution.solve_limited(grid, deadline=deadline)
+    if result.status == bitboard.EXHAUSTED:
+        return TIMEOUT
+    if result.solution is None:
+        return UNSOLVABLE
+    return ''.join(map(result.solution.__getitem__, solution.BOXES))
+
+
+def _solve_within(seconds, line):
+    return solve_line(line, time.monotonic() + seconds)
+
+
+def _puzzle_lines(stream):
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def run(stream, out, workers=1, chunksize=64, max_pending=16, timeout=None):
+    """Solve every puzzle line of stream, writing results to out.
+
+    With timeout, each puzzle gets that many seconds before it gives up
+    with TIMEOUT.
+
+    Returns:
+        A dict counting 'puzzles', 'solved', 'unsolvable', 'invalid' and
+        'timeout'.
+    """
+    counts = {'puzzles': 0, 'solved': 0, 'unsolvable': 0, 'invalid': 0, 'timeout': 0}
+    lines = _puzzle_lines(stream)
+    solve = solve_line if timeout is None else partial(_solve_within, timeout)
+    if workers == 1:
+        results = map(solve, lines)
+        pool = None
+    else:
+        pool = Pool(workers)
+        results = batch.map_bounded(pool, solve, lines, chunksize, max_pending)
+    try:
+        for result in results:
+            counts['puzzles'] += 1
+            if result == UNSOLVABLE:
+                counts['unsolvable'] += 1
+            elif result == INVALID:
+                counts['invalid'] += 1
+            elif result == TIMEOUT:
+                counts['timeout'] += 1
+            else:
+                counts['solved'] += 1
+            out.write(result + '\n')
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve diagonal sudoku puzzles, one per line.")
+    parser.add_argument('input', nargs='?', default='-',
+                        help="puzzle file, or - for stdin (default)")
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="worker processes (default 1)")
+    parser.add_argument('--chunksize', type=int, default=64,
+                        help="puzzles sent to a worker at a time (default 64)")
+    parser.add_argument('--max-pending', type=int, default=16,
+                        help="chunks in flight at once (default 16)")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="seconds allowed per puzzle before TIMEOUT (default no limit)")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.input == '-' else open(args.input)
+    start = time.perf_counter()
+    try:
+        counts = run(stream, sys.stdout, args.workers, args.chunksize, args.max_pending,
+                     args.timeout)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    elapsed = time.perf_counter() - start
+
+    rate = counts['puzzles'] / elapsed if elapsed else 0.0
+    print("{puzzles} puzzles ({solved} solved, {unsolvable} unsolvable, {invalid} invalid,"
+          " {timeout} timed out)"
+          " in {elapsed:.2f}s, {rate:.0f} puzzles/s".format(elapsed=elapsed, rate=rate, **counts),
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
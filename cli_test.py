@@ -0,0 +1,42 @@
+import io
+import unittest
+
+import cli
+import solution
+import solution_test
+
+
+class TestRun(unittest.TestCase):
+    diagonal = solution_test.TestDiagonalSudoku
+    solved_line = ''.join(map(diagonal.solved_diag_sudoku.get, solution.BOXES))
+    lines = [diagonal.diagonal_grid, '', '11' + '.' * 79, 'not a grid', diagonal.diagonal_grid]
+    expected = [solved_line, cli.UNSOLVABLE, cli.INVALID, solved_line]
+
+    def run_lines(self, **kwargs):
+        out = io.StringIO()
+        counts = cli.run(io.StringIO('\n'.join(self.lines) + '\n'), out, **kwargs)
+        return out.getvalue().splitlines(), counts
+
+    def test_in_process(self):
+        output, counts = self.run_lines()
+        self.assertEqual(output, self.expected)
+        self.assertEqual(counts, {'puzzles': 4, 'solved': 2, 'unsolvable': 1, 'invalid': 1,
+                                  'timeout': 0})
+
+    def test_deadline(self):
+        self.assertEqual(cli.solve_line(self.diagonal.diagonal_grid, deadline=0), cli.TIMEOUT)
+        self.assertEqual(cli.solve_line(self.diagonal.diagonal_grid, deadline=None), self.solved_line)
+
+    def test_timeouts_counted(self):
+        output, counts = self.run_lines(timeout=-1)
+        # the duplicate given fails in the first propagation, before any deadline check
+        self.assertEqual(output, [cli.TIMEOUT, cli.UNSOLVABLE, cli.INVALID, cli.TIMEOUT])
+        self.assertEqual((counts['timeout'], counts['solved']), (2, 0))
+
+    def test_workers_keep_order(self):
+        output, _ = self.run_lines(workers=2, chunksize=1, max_pending=2)
+        self.assertEqual(output, self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""Exact-cover solving backend using Algorithm X on dancing links.
+
+A sudoku is an exact-cover problem: every box holds exactly one digit, and
+every unit (rows, columns, squares and, on diagonal boards, the two
+diagonals) holds every digit exactly once. Each candidate (box, digit) is a
+matrix row covering one box column plus one (unit, digit) column per unit
+of the box, and a solution is a set of rows covering every column once.
+
+The matrix is stored as parallel integer lists (left, right, up, down,
+column) rather than node objects, and the search keeps its own stack so
+large boards do not run into the recursion limit.
+"""
+from topology import DIAGONAL_9X9
+
+
+class ExactCover:
+    """Dancing-links matrix for one board.
+
+    Args:
+        board: list of candidate masks in bitboard form; a box with a single
+            candidate is a given.
+        topo: Topology of the board.
+    """
+
+    def __init__(self, board, topo=DIAGONAL_9X9):
+        self.topo = topo
+        n = topo.size
+        columns = topo.cells + len(topo.unitlist) * n
+
+        # node 0 is the root, nodes 1..columns are the column headers
+        self.left = [columns] + list(range(columns))
+        self.right = list(range(1, columns + 1)) + [0]
+        self.up = list(range(columns + 1))
+        self.down = list(range(columns + 1))
+        self.column = list(range(columns + 1))
+        self.size = [0] * (columns + 1)
+        # (box, digit bit) of the row every node belongs to
+        self.candidate = [None] * (columns + 1)
+        self.nodes = 0
+
+        for box, mask in enumerate(board):
+            for digit, bit in enumerate(topo.digit_bits):
+                if mask & bit:
+                    headers = [box + 1] + [topo.cells + u * n + digit + 1
+                                           for u in topo.units[box]]
+                    self._add_row(headers, (box, bit))
+
+    def _add_row(self, headers, candidate):
+        left, right, up, down = self.left, self.right, self.up, self.down
+        first = len(self.column)
+        for offset, header in enumerate(headers):
+            node = first + offset
+            # insert at the bottom of the column, linked to its row neighbours
+            up.append(up[header])
+            down.append(header)
+            down[up[header]] = node
+            up[header] = node
+            left.append(node - 1 if offset else first + len(headers) - 1)
+            right.append(node + 1 if offset < len(headers) - 1 else first)
+            self.column.append(header)
+            self.candidate.append(candidate)
+            self.size[header] += 1
+
+    def _cover(self, c):
+        left, right, up, down, column, size = (self.left, self.right, self.up,
+                                               self.down, self.column, self.size)
+        left[right[c]] = left[c]
+        right[left[c]] = right[c]
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, c):
+        left, right, up, down, column, size = (self.left, self.right, self.up,
+                                               self.down, self.column, self.size)
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        left[right[c]] = c
+        right[left[c]] = c
+
+    def _choose_column(self):
+        # fewest remaining rows first; an empty column is a dead end
+        right, size = self.right, self.size
+        best, best_size = None, None
+        c = right[0]
+        while c:
+            if best_size is None or size[c] < best_size:
+                best, best_size = c, size[c]
+                if best_size <= 1:
+                    break
+            c = right[c]
+        return best
+
+    def solutions(self):
+        """Yield each exact cover as a list of (box, digit bit) pairs."""
+        right, down, left, column = self.right, self.down, self.left, self.column
+        chosen = []     # one entry per open column: the row node being tried
+        descend = True
+        while True:
+            if descend:
+                self.nodes += 1
+                if right[0] == 0:
+                    yield [self.candidate[node] for node in chosen]
+                else:
+                    c = self._choose_column()
+                    self._cover(c)
+                    # the header stands for "no row tried yet"
+                    chosen.append(c)
+
+            # Advance the deepest column to its next row, backtracking as needed
+            descend = False
+            while chosen:
+                node = chosen.pop()
+                c = column[node]
+                if node != c:
+                    j = left[node]
+                    while j != node:
+                        self._uncover(column[j])
+                        j = left[j]
+                node = down[node]
+                if node == c:
+                    self._uncover(c)
+                    continue
+                chosen.append(node)
+                j = right[node]
+                while j != node:
+                    self._cover(column[j])
+                    j = right[j]
+                descend = True
+                break
+            if not descend:
+                return
+
+
+def search(board, topo=DIAGONAL_9X9):
+    """Solve a board of candidate masks by exact cover.
+
+    Returns:
+        The solved board as a new list of masks, or False if the board has
+        no solution.
+    """
+    for cover in ExactCover(board, topo).solutions():
+        solved = list(board)
+        for box, bit in cover:
+            solved[box] = bit
+        return solved
+    return False
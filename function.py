@@ -7,6 +7,7 @@
 from heapq import heappush, heappop
 from utils import *
 from utils import boxes, peers, row_units, unitlist
+from solution import Pipeline
 
 
 def grid_values(grid):
@@ -85,25 +86,8 @@ def only_choice(values):
     return values
 
 
-def reduce_puzzle(values):
-    stalled = False
-    while not stalled:
-        # Check how many boxes have a determined value
-        solved_values_before = len([box for box in values.keys() if len(values[box]) == 1])
-
-        # Your code here: Use the Eliminate Strategy
-        values = eliminate(values)
-        # Your code here: Use the Only Choice Strategy
-        values = only_choice(values)
-
-        # Check how many boxes have a determined value, to compare
-        solved_values_after = len([box for box in values.keys() if len(values[box]) == 1])
-        # If no new values were added, stop the loop.
-        stalled = solved_values_before == solved_values_after
-        # Sanity check, return False if there is a box with zero available values:
-        if len([box for box in values.keys() if len(values[box]) == 0]):
-            return False
-    return values
+# the loop of solution.reduce_puzzle, without naked twins
+reduce_puzzle = Pipeline([[eliminate, only_choice]])
 
 
 def search(values):
@@ -0,0 +1,21 @@
+import unittest
+
+import generator
+import solution
+
+
+class TestGenerate(unittest.TestCase):
+
+    def test_unique_with_target_clues(self):
+        puzzle = generator.generate(clues=26, seed=11)
+        self.assertEqual(81 - puzzle.count('.'), 26)
+        self.assertTrue(solution.is_unique(puzzle))
+
+    def test_seeded(self):
+        self.assertEqual(generator.generate(clues=30, seed='a'), generator.generate(clues=30, seed='a'))
+        self.assertEqual(list(generator.generate_many(3, clues=30, seed=5, workers=1)),
+                         list(generator.generate_many(3, clues=30, seed=5, workers=2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
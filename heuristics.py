@@ -0,0 +1,110 @@
+"""Branching heuristics for the trail search in bitboard.Search.
+
+A variable heuristic chooses the box to branch on. Search hands it the
+board once after the first propagation (attach) and the units blamed for
+each failed propagation (failed), then asks it for the next box (select).
+Each select reads every box through the topology's open_count table and
+finds the fewest candidates with min and list.index, as Search does
+without a heuristic. Keeping boxes in buckets by count and moving the
+changed ones after every propagation and undo cost more than this scan:
+a node changes more boxes than there are on the board.
+
+A value heuristic is a function (board, box, remaining, topo) returning
+the next candidate bit of box to try out of the mask remaining.
+
+    Search(board, variable=MRVDegree(), value=least_constraining)
+"""
+
+class MinRemaining:
+    """Branch on the open box with the fewest candidates, lowest index first.
+
+    Picks the same boxes as Search without a heuristic.
+    """
+
+    def attach(self, board, topo):
+        self.topo = topo
+
+    def failed(self, units):
+        pass
+
+    def select(self, board):
+        """Return the box to branch on, or None once every box is solved."""
+        counts = [self.topo.open_count[mask] for mask in board]
+        fewest = min(counts)
+        if fewest > self.topo.size:
+            return None
+        return self._pick(board, counts, fewest)
+
+    def _pick(self, board, counts, fewest):
+        return counts.index(fewest)
+
+
+class MRVDegree(MinRemaining):
+    """Fewest candidates first, ties going to the box with most open peers."""
+
+    def _pick(self, board, counts, fewest):
+        peers, is_open, count_of = self.topo.peers, self.topo.size.__ge__, counts.__getitem__
+        best, best_open = None, -1
+        box = counts.index(fewest)
+        while True:
+            open_peers = sum(map(is_open, map(count_of, peers[box])))
+            if open_peers > best_open:
+                best, best_open = box, open_peers
+            try:
+                box = counts.index(fewest, box + 1)
+            except ValueError:
+                return best
+
+
+class DomWDeg(MinRemaining):
+    """Smallest ratio of candidates to the weight of the box's units.
+
+    Every unit starts with weight 1 and gains 1 each time a propagation
+    fails in it, so boxes in units that keep causing dead ends are tried
+    first. The weights carry across the whole search.
+    """
+
+    def attach(self, board, topo):
+        super().attach(board, topo)
+        self.weights = [1] * len(topo.unitlist)
+        # summed weight of the units of each box
+        self.box_weights = [len(units) for units in topo.units]
+
+    def failed(self, units):
+        box_weights = self.box_weights
+        for u in units:
+            self.weights[u] += 1
+            for box in self.topo.unitlist[u]:
+                box_weights[box] += 1
+
+    def select(self, board):
+        bit_count, box_weights = self.topo.bit_count, self.box_weights
+        best, best_score = None, None
+        for box, mask in enumerate(board):
+            count = bit_count[mask]
+            if count > 1:
+                score = count / box_weights[box]
+                if best_score is None or score < best_score:
+                    best, best_score = box, score
+        return best
+
+
+def least_constraining(board, box, remaining, topo):
+    """Return the candidate in remaining that the fewest peers of box share.
+
+    Trying it first rules out the fewest candidates elsewhere on the board.
+    Ties go to the lowest digit.
+    """
+    peers = topo.peers[box]
+    best, best_hits = None, None
+    for bit in topo.digit_bits:
+        if remaining & bit:
+            hits = sum(1 for peer in peers if board[peer] & bit)
+            if best_hits is None or hits < best_hits:
+                best, best_hits = bit, hits
+    return best
+
+
+# Heuristics by name
+VARIABLES = {'mrv': MinRemaining, 'degree': MRVDegree, 'wdeg': DomWDeg}
+VALUES = {'lcv': least_constraining}
@@ -0,0 +1,64 @@
+import unittest
+
+import benchmark
+import bitboard
+import heuristics
+import solution
+import solution_test
+
+
+class TestHeuristics(unittest.TestCase):
+    sparse_grid = solution_test.TestTrace.sparse_grid
+    two_solution_grid = solution_test.TestCountSolutions.two_solution_grid
+
+    def search(self, grid, limit=None, **options):
+        engine = bitboard.Search(bitboard.from_values(solution.grid_values(grid)), **options)
+        solved = []
+        for board in engine.solutions():
+            solved.append(bitboard.to_values(board))
+            if len(solved) == limit:
+                break
+        return solved, engine.stats.nodes
+
+    def test_min_remaining_matches_default(self):
+        self.assertEqual(self.search(self.sparse_grid, 1, variable=heuristics.MinRemaining()),
+                         self.search(self.sparse_grid, 1))
+
+    def test_same_solutions(self):
+        expected = sorted(map(sorted, self.search(self.two_solution_grid)[0]))
+        for variable in heuristics.VARIABLES.values():
+            for value in (None, heuristics.least_constraining):
+                solved, _ = self.search(self.two_solution_grid, variable=variable(), value=value)
+                self.assertEqual(sorted(map(sorted, solved)), expected)
+
+    def test_degree_cuts_nodes(self):
+        grid = benchmark.load_corpus(['hard'])['hard'][0]
+        _, plain = self.search(grid, 1)
+        _, degree = self.search(grid, 1, variable=heuristics.MRVDegree())
+        self.assertLess(degree, plain)
+
+    def test_degree_select(self):
+        topo = bitboard.DIAGONAL_9X9
+        board = bitboard.from_values(solution.grid_values(self.sparse_grid))
+        bitboard.propagate(board)
+        variable = heuristics.MRVDegree()
+        variable.attach(board, topo)
+        open_boxes = [box for box, mask in enumerate(board) if topo.bit_count[mask] > 1]
+        expected = min(open_boxes, key=lambda box: (
+            topo.bit_count[board[box]],
+            -sum(topo.bit_count[board[peer]] > 1 for peer in topo.peers[box]), box))
+        self.assertEqual(variable.select(board), expected)
+        self.assertIsNone(variable.select([1] * 81))
+
+    def test_least_constraining(self):
+        board = [bitboard.ALL_DIGITS] * 81
+        board[1] = bitboard.DIGIT_MASK['1'] | bitboard.DIGIT_MASK['2']
+        board[2] = bitboard.DIGIT_MASK['1'] | bitboard.DIGIT_MASK['3']
+        remaining = bitboard.DIGIT_MASK['1'] | bitboard.DIGIT_MASK['2'] | bitboard.DIGIT_MASK['3']
+        # 1 is shared by boxes 1 and 2, while 2 and 3 each by one, so the tie goes to 2
+        self.assertEqual(heuristics.least_constraining(board, 0, remaining, bitboard.DIAGONAL_9X9),
+                         bitboard.DIGIT_MASK['2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
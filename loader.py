@@ -0,0 +1,179 @@
+"""Load and validate whole files of 9x9 diagonal puzzles at once.
+
+Usage:
+    python loader.py puzzles.txt
+
+The file is memory-mapped and walked by newline offsets. Each line is
+turned into 81 digit codes (0 for an empty box, 1-9 for a given) with a
+single bytes.translate call that also drops spaces, tabs and carriage
+returns, so no str is decoded per line. A line is rejected when it does not
+hold 81 boxes, holds a character other than '1'-'9', '.' or '0', or repeats
+a given digit within a row, column, square or diagonal. Blank lines are
+skipped.
+
+The accepted puzzles are kept in one bytearray of 81 codes per puzzle, with
+their line numbers in an array, which is what the solvers convert from:
+Puzzles.board(i) gives a bitboard list of masks and
+vectorized.from_digits(puzzles.digits) the NumPy array of every board.
+"""
+import argparse
+import mmap
+import sys
+from array import array
+
+import bitboard
+
+INVALID_CODE = 0xFF
+_CODES = bytearray([INVALID_CODE]) * 256
+_CODES[ord('.')] = _CODES[ord('0')] = 0
+for _digit in range(1, 10):
+    _CODES[ord(str(_digit))] = _digit
+CODES = bytes(_CODES)
+IGNORED = b' \t\r'
+
+# candidate mask of each digit code, all digits for an empty box
+MASKS = [bitboard.ALL_DIGITS] + bitboard.DIGIT_BITS
+
+# Duplicate givens are found for all units at once by adding up one
+# integer per given: _INCIDENCES[box][code] sets the bit of the digit in
+# every unit of the box, above a 10-bit count of those bits. Without a
+# duplicate no two bits collide, so the sum has as many bits set as the
+# count says; any collision carries and leaves fewer.
+_COUNT_BITS = 10
+_INCIDENCES = [[0] + [(sum(1 << (u * 9 + code - 1) for u in units) << _COUNT_BITS) + len(units)
+                      for code in range(1, 10)]
+               for units in bitboard.UNITS]
+_COUNT_MASK = (1 << _COUNT_BITS) - 1
+
+def check_line(cells):
+    """Return the reason 81 digit codes are not a valid puzzle, or None."""
+    if len(cells) != 81:
+        return "expected 81 boxes, found {}".format(len(cells))
+    if INVALID_CODE in cells:
+        return "unexpected character"
+    total = sum(map(list.__getitem__, _INCIDENCES, cells))
+    if bin(total >> _COUNT_BITS).count('1') == total & _COUNT_MASK:
+        return None
+    # find the duplicate to report it
+    seen = [0] * len(bitboard.UNITLIST)
+    box_units = bitboard.UNITS
+    for box, code in enumerate(cells):
+        if code:
+            bit = 1 << code
+            for u in box_units[box]:
+                if seen[u] & bit:
+                    return "duplicate {} in {}".format(code, _unit_name(u))
+                seen[u] |= bit
+    return None
+
+
+def _unit_name(u):
+    if u < 9:
+        return "row " + bitboard.ROWS[u]
+    if u < 18:
+        return "column " + bitboard.COLS[u - 9]
+    if u < 27:
+        return "square {}".format(u - 17)
+    return "diagonal" if u == 27 else "anti-diagonal"
+
+
+class Puzzles:
+    """Puzzles parsed from one file.
+
+    Attributes:
+        digits: bytearray of 81 digit codes per puzzle, 0 for an empty box.
+        lines: array of the line number each puzzle came from.
+        errors: list of (line number, reason) for every rejected line.
+    """
+
+    def __init__(self):
+        self.digits = bytearray()
+        self.lines = array('I')
+        self.errors = []
+
+    def __len__(self):
+        return len(self.lines)
+
+    def codes(self, i):
+        """Return the 81 digit codes of puzzle i."""
+        return self.digits[81 * i:81 * i + 81]
+
+    def grid(self, i):
+        """Return puzzle i as a grid string with '.' for empty boxes."""
+        return ''.join(str(code) if code else '.' for code in self.codes(i))
+
+    def board(self, i):
+        """Return puzzle i as a bitboard list of candidate masks."""
+        return [MASKS[code] for code in self.codes(i)]
+
+    def boards(self):
+        """Yield every puzzle as a bitboard list of candidate masks."""
+        for i in range(len(self)):
+            yield self.board(i)
+
+    def grids(self):
+        """Yield every puzzle as a grid string."""
+        for i in range(len(self)):
+            yield self.grid(i)
+
+
+def parse(data, puzzles=None):
+    """Parse every line of a bytes-like object of puzzles.
+
+    Args:
+        data: bytes, bytearray or mmap holding the whole file.
+        puzzles: Puzzles to append to; a new one when None.
+    Returns:
+        The Puzzles, with bad lines listed in its errors.
+    """
+    puzzles = Puzzles() if puzzles is None else puzzles
+    digits, lines, errors = puzzles.digits, puzzles.lines, puzzles.errors
+    start, end, number = 0, len(data), 0
+    while start < end:
+        stop = data.find(b'\n', start)
+        if stop < 0:
+            stop = end
+        number += 1
+        cells = data[start:stop].translate(CODES, IGNORED)
+        start = stop + 1
+        if not cells:
+            continue
+        reason = check_line(cells)
+        if reason is None:
+            digits += cells
+            lines.append(number)
+        else:
+            errors.append((number, reason))
+    return puzzles
+
+
+def load(path):
+    """Memory-map the puzzle file at path and parse it.
+
+    Returns:
+        Puzzles holding every valid line, with the bad ones in its errors.
+    """
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file cannot be mapped
+            return Puzzles()
+        with data:
+            return parse(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a file of diagonal sudoku puzzles.")
+    parser.add_argument('path', help="puzzle file, one 81-character grid per line")
+    args = parser.parse_args(argv)
+
+    puzzles = load(args.path)
+    for number, reason in puzzles.errors:
+        print("line {}: {}".format(number, reason))
+    print("{} puzzles, {} bad lines".format(len(puzzles), len(puzzles.errors)), file=sys.stderr)
+    return 1 if puzzles.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
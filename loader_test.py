@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+import benchmark
+import bitboard
+import loader
+import solution
+import solution_test
+
+try:
+    import vectorized
+except ImportError:
+    vectorized = None
+
+
+class TestLoad(unittest.TestCase):
+    grid = solution_test.TestDiagonalSudoku.diagonal_grid
+    lines = [grid,                      # 1
+             '',                        # 2: skipped
+             '11' + '.' * 79,           # 3: duplicate in a row
+             '1' + '.' * 39 + '1' + '.' * 40,  # 4: duplicate on the diagonal
+             grid[:40],                 # 5: too short
+             'x' + grid[1:],            # 6: bad character
+             ' '.join(grid[:9]) + grid[9:] + '\r',   # 7: spaces and CRLF are fine
+             '0' + grid[1:]]            # 8: '0' is an empty box
+
+    def load(self, text):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'puzzles.txt')
+            with open(path, 'w', newline='') as f:
+                f.write(text)
+            return loader.load(path)
+
+    def test_lines_and_errors(self):
+        puzzles = self.load('\n'.join(self.lines))
+        self.assertEqual(list(puzzles.lines), [1, 7, 8])
+        self.assertEqual([number for number, _ in puzzles.errors], [3, 4, 5, 6])
+        self.assertIn('row A', puzzles.errors[0][1])
+        self.assertIn('diagonal', puzzles.errors[1][1])
+        self.assertEqual(puzzles.grid(1), self.grid)
+        self.assertEqual(list(puzzles.grids()), [self.grid, self.grid, '.' + self.grid[1:]])
+
+    def test_boards_match_grid_values(self):
+        grids = benchmark.load_corpus(['easy'])['easy'][:5]
+        puzzles = self.load('\n'.join(grids) + '\n')
+        self.assertEqual(list(puzzles.boards()),
+                         [bitboard.from_values(solution.grid_values(grid)) for grid in grids])
+        self.assertEqual(len(self.load('')), 0)
+
+    @unittest.skipIf(vectorized is None, "NumPy is not installed")
+    def test_from_digits(self):
+        grids = benchmark.load_corpus(['hard'])['hard'][:5]
+        puzzles = self.load('\n'.join(grids))
+        self.assertTrue((vectorized.from_digits(puzzles.digits) == vectorized.from_grids(grids)).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,310 @@
+"""Store puzzles and solutions in a packed binary file with random access.
+
+Usage:
+    python packed.py pack puzzles.txt puzzles.sdkp
+    python packed.py solve puzzles.sdkp solutions.sdkp --workers 4
+    python packed.py unpack solutions.sdkp > solutions.txt
+
+A file is a 16-byte header followed by one fixed-size record per grid. The
+header holds the magic b'SDKP', the format version, the bits per box, the
+boxes per grid and the record size, all little-endian. A record keeps the
+81 boxes in BOXES order, two to a byte with the first box in the high
+nibble: 0 for an empty box, 1-9 for a digit. The 82nd nibble is padding,
+so a record is 41 bytes, half of a text line with its newline and a small
+fraction of the dictionary form. A record with every nibble set to 15
+holds no grid, which is how a solutions file marks an unsolvable puzzle.
+
+Record i starts at byte 16 + 41 * i, so load() memory-maps the file and
+reads any record without touching the others. Whole files are packed and
+unpacked with bytes.translate and one big integer OR rather than a loop
+over boxes.
+"""
+import argparse
+import mmap
+import struct
+import sys
+
+import batch
+import bitboard
+import cli
+import loader
+
+MAGIC = b'SDKP'
+VERSION = 1
+CELL_BITS = 4
+CELLS = 81
+RECORD_SIZE = (CELLS + 1) // 2
+HEADER = struct.Struct('<4sBBHI4x')
+HEADER_SIZE = HEADER.size
+NO_GRID = b'\xff' * RECORD_SIZE
+
+# digit code to high nibble, and packed byte to its high and low nibble
+_SHIFT = bytes((code << 4) & 0xFF for code in range(256))
+_HIGH = bytes(byte >> 4 for byte in range(256))
+_LOW = bytes(byte & 0x0F for byte in range(256))
+_GRID_CHARS = b'.123456789' + b'?' * 246
+
+
+def pack(digits):
+    """Pack 81 digit codes per grid (0 for empty) into records.
+
+    digits is any bytes-like object, such as loader.Puzzles.digits.
+
+    Raises:
+        ValueError: if the length is not a whole number of grids or a code
+            is not 0-9.
+    """
+    digits = bytes(digits)
+    if len(digits) % CELLS:
+        raise ValueError("expected 81 digit codes per grid, found {}".format(len(digits)))
+    if digits.translate(None, bytes(range(10))):
+        raise ValueError("digit codes must be 0-9")
+    if not digits:
+        return b''
+    # pad every grid to 82 boxes, then OR the shifted even boxes onto the odd ones
+    padded = b'\0'.join(digits[start:start + CELLS]
+                        for start in range(0, len(digits), CELLS)) + b'\0'
+    high, low = padded[0::2].translate(_SHIFT), padded[1::2]
+    return (int.from_bytes(high, 'big') | int.from_bytes(low, 'big')).to_bytes(len(low), 'big')
+
+
+def unpack(records):
+    """Unpack whole records into 81 digit codes per grid.
+
+    A record that holds no grid comes out as 81 codes of 15.
+    """
+    records = bytes(records)
+    nibbles = bytearray(2 * len(records))
+    nibbles[0::2] = records.translate(_HIGH)
+    nibbles[1::2] = records.translate(_LOW)
+    size = 2 * RECORD_SIZE
+    return b''.join(nibbles[start:start + CELLS] for start in range(0, len(nibbles), size))
+
+
+def _codes(grid):
+    """Return the 81 digit codes of a grid string, values dict or codes."""
+    if isinstance(grid, str):
+        codes = grid.encode('ascii', 'replace').translate(loader.CODES, loader.IGNORED)
+        if len(codes) != CELLS or loader.INVALID_CODE in codes:
+            raise ValueError("not a sudoku grid: {!r}".format(grid))
+        return codes
+    if isinstance(grid, dict):
+        return bytes(int(grid[box]) if len(grid[box]) == 1 else 0 for box in bitboard.BOXES)
+    return bytes(grid)
+
+
+class Writer:
+    """Write records to a binary stream, starting with the header.
+
+    Use create(path) to write a new file; a Writer is a context manager
+    that closes its stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+        stream.write(HEADER.pack(MAGIC, VERSION, CELL_BITS, CELLS, RECORD_SIZE))
+
+    def write(self, grid):
+        """Append one grid.
+
+        grid is a grid string, a board in dictionary form as solve()
+        returns it (unsolved boxes are stored empty), 81 digit codes, or
+        False or None for no grid.
+        """
+        if grid is False or grid is None:
+            self.stream.write(NO_GRID)
+            self.count += 1
+        else:
+            self.write_digits(_codes(grid))
+
+    def write_digits(self, digits):
+        """Append every grid of 81 digit codes per grid at once."""
+        self.stream.write(pack(digits))
+        self.count += len(digits) // CELLS
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def create(path):
+    """Open a new packed file at path for writing."""
+    return Writer(open(path, 'wb'))
+
+
+class PackedFile:
+    """Random access to the records of a packed file.
+
+    data is the whole file as bytes or an mmap; load(path) maps one from
+    disk. Indexes run from 0 to len() - 1.
+
+    Raises:
+        ValueError: if the header is not one this module writes or the
+            data does not end on a record boundary.
+    """
+
+    def __init__(self, data):
+        if len(data) < HEADER_SIZE:
+            raise ValueError("not a packed sudoku file: too short")
+        magic, version, cell_bits, cells, record_size = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a packed sudoku file: bad magic {!r}".format(magic))
+        if (version, cell_bits, cells, record_size) != (VERSION, CELL_BITS, CELLS, RECORD_SIZE):
+            raise ValueError("unsupported packed sudoku format: version {}, {} bits, {} boxes"
+                             .format(version, cell_bits, cells))
+        if (len(data) - HEADER_SIZE) % RECORD_SIZE:
+            raise ValueError("packed sudoku file is truncated")
+        self.data = data
+
+    def __len__(self):
+        return (len(self.data) - HEADER_SIZE) // RECORD_SIZE
+
+    def record(self, i):
+        """Return the packed bytes of record i."""
+        if not 0 <= i < len(self):
+            raise IndexError("record {} out of range".format(i))
+        start = HEADER_SIZE + i * RECORD_SIZE
+        return self.data[start:start + RECORD_SIZE]
+
+    def codes(self, i):
+        """Return the 81 digit codes of record i, or None if it holds no grid."""
+        record = self.record(i)
+        return None if record == NO_GRID else unpack(record)
+
+    def grid(self, i):
+        """Return record i as a grid string with '.' for empty boxes, or None."""
+        codes = self.codes(i)
+        return None if codes is None else codes.translate(_GRID_CHARS).decode('ascii')
+
+    def board(self, i):
+        """Return record i as a bitboard list of candidate masks, or None."""
+        codes = self.codes(i)
+        return None if codes is None else [loader.MASKS[code] for code in codes]
+
+    def values(self, i):
+        """Return record i in dictionary form, or False if it holds no grid."""
+        board = self.board(i)
+        return False if board is None else bitboard.to_values(board)
+
+    def grids(self):
+        """Yield every record as a grid string, or None where it holds no grid."""
+        for i in range(len(self)):
+            yield self.grid(i)
+
+    def digits(self):
+        """Return 81 digit codes per record for the whole file at once.
+
+        Records with no grid come out as codes of 15. The result feeds
+        vectorized.from_digits directly.
+        """
+        return unpack(self.data[HEADER_SIZE:])
+
+    def close(self):
+        if hasattr(self.data, 'close'):
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load(path):
+    """Memory-map the packed file at path."""
+    with open(path, 'rb') as f:
+        return PackedFile(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def pack_text(text_path, packed_path):
+    """Convert a text file of puzzles, one per line, into a packed file.
+
+    Lines are read and checked by loader.load; bad lines are left out.
+
+    Returns:
+        The loader.Puzzles read, whose lines and errors give the line
+        number behind each record and each rejected line.
+    """
+    puzzles = loader.load(text_path)
+    with create(packed_path) as out:
+        out.write_digits(puzzles.digits)
+    return puzzles
+
+
+def unpack_text(packed_path, out):
+    """Write every record of a packed file to out as a text line.
+
+    Records with no grid are written as UNSOLVABLE, as cli.py does.
+    """
+    with load(packed_path) as packed:
+        for grid in packed.grids():
+            out.write((cli.UNSOLVABLE if grid is None else grid) + '\n')
+
+
+def _puzzle_grids(puzzles):
+    for i, grid in enumerate(puzzles.grids()):
+        if grid is None:
+            raise ValueError("record {} holds no puzzle".format(i))
+        yield grid
+
+
+def solve_file(source, target, workers=1, chunksize=64, max_pending=16):
+    """Solve every record of the packed file source into the packed file target.
+
+    Record i of target holds the solution of record i of source, or no
+    grid when it is unsolvable. Puzzles are solved through
+    batch.solve_many, so workers and chunksize mean the same there.
+
+    Returns:
+        A dict counting 'puzzles', 'solved' and 'unsolvable'.
+    """
+    counts = {'puzzles': 0, 'solved': 0, 'unsolvable': 0}
+    with load(source) as puzzles, create(target) as out:
+        for values in batch.solve_many(_puzzle_grids(puzzles), workers, chunksize, max_pending=max_pending):
+            counts['puzzles'] += 1
+            counts['solved' if values else 'unsolvable'] += 1
+            out.write(values)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert and solve packed sudoku files.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack_parser = commands.add_parser('pack', help="text puzzles to a packed file")
+    pack_parser.add_argument('text')
+    pack_parser.add_argument('packed')
+    unpack_parser = commands.add_parser('unpack', help="packed file to text on stdout")
+    unpack_parser.add_argument('packed')
+    solve_parser = commands.add_parser('solve', help="packed puzzles to packed solutions")
+    solve_parser.add_argument('source')
+    solve_parser.add_argument('target')
+    solve_parser.add_argument('-w', '--workers', type=int, default=1,
+                              help="worker processes (default 1)")
+    solve_parser.add_argument('--chunksize', type=int, default=64,
+                              help="puzzles sent to a worker at a time (default 64)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'pack':
+        puzzles = pack_text(args.text, args.packed)
+        for number, reason in puzzles.errors:
+            print("line {}: {}".format(number, reason), file=sys.stderr)
+        print("{} puzzles packed, {} bad lines".format(len(puzzles), len(puzzles.errors)),
+              file=sys.stderr)
+        return 1 if puzzles.errors else 0
+    if args.command == 'unpack':
+        unpack_text(args.packed, sys.stdout)
+        return 0
+    counts = solve_file(args.source, args.target, args.workers, args.chunksize)
+    print("{puzzles} puzzles ({solved} solved, {unsolvable} unsolvable)".format(**counts),
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import io
+import os
+import tempfile
+import unittest
+
+import benchmark
+import bitboard
+import cli
+import packed
+import solution
+import solution_test
+
+try:
+    import vectorized
+except ImportError:
+    vectorized = None
+
+
+class TestPacked(unittest.TestCase):
+    diagonal = solution_test.TestDiagonalSudoku
+    grid = diagonal.diagonal_grid
+    solved = ''.join(map(diagonal.solved_diag_sudoku.get, solution.BOXES))
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_round_trip(self):
+        grids = benchmark.load_corpus(['hard'])['hard'][:20]
+        with packed.create(self.path('hard.sdkp')) as out:
+            for grid in grids:
+                out.write(grid)
+            out.write(False)
+            out.write(self.diagonal.solved_diag_sudoku)
+        size = os.path.getsize(self.path('hard.sdkp'))
+        self.assertEqual(size, packed.HEADER_SIZE + 22 * packed.RECORD_SIZE)
+        with packed.load(self.path('hard.sdkp')) as records:
+            self.assertEqual(len(records), 22)
+            self.assertEqual(list(records.grids()), grids + [None, self.solved])
+            self.assertEqual(records.board(3), bitboard.from_values(solution.grid_values(grids[3])))
+            self.assertEqual(records.values(21), self.diagonal.solved_diag_sudoku)
+            self.assertIs(records.values(20), False)
+            self.assertEqual(records.digits()[:81], records.codes(0))
+            with self.assertRaises(IndexError):
+                records.record(22)
+
+    def test_rejects_bad_data(self):
+        with self.assertRaises(ValueError):
+            packed.PackedFile(b'TEXT' + bytes(12))
+        header = packed.HEADER.pack(packed.MAGIC, packed.VERSION, packed.CELL_BITS,
+                                    packed.CELLS, packed.RECORD_SIZE)
+        with self.assertRaises(ValueError):
+            packed.PackedFile(header + bytes(packed.RECORD_SIZE - 1))
+        self.assertEqual(len(packed.PackedFile(header)), 0)
+        with self.assertRaises(ValueError):
+            packed.pack(b'\x0a' * 81)
+        with self.assertRaises(ValueError):
+            packed.Writer(io.BytesIO()).write('not a grid')
+
+    def test_text_conversion_and_solve(self):
+        with open(self.path('puzzles.txt'), 'w') as f:
+            f.write('\n'.join([self.grid, '11' + '.' * 79, self.grid]) + '\n')
+        puzzles = packed.pack_text(self.path('puzzles.txt'), self.path('puzzles.sdkp'))
+        self.assertEqual(puzzles.errors[0][0], 2)
+        counts = packed.solve_file(self.path('puzzles.sdkp'), self.path('solutions.sdkp'))
+        self.assertEqual(counts, {'puzzles': 2, 'solved': 2, 'unsolvable': 0})
+        out = io.StringIO()
+        packed.unpack_text(self.path('solutions.sdkp'), out)
+        self.assertEqual(out.getvalue().splitlines(), [self.solved, self.solved])
+
+        with packed.create(self.path('bad.sdkp')) as writer:
+            writer.write(self.grid[:-2] + '99')
+        packed.solve_file(self.path('bad.sdkp'), self.path('none.sdkp'))
+        out = io.StringIO()
+        packed.unpack_text(self.path('none.sdkp'), out)
+        self.assertEqual(out.getvalue(), cli.UNSOLVABLE + '\n')
+
+    @unittest.skipIf(vectorized is None, "NumPy is not installed")
+    def test_from_digits(self):
+        grids = benchmark.load_corpus(['easy'])['easy'][:10]
+        with packed.create(self.path('easy.sdkp')) as out:
+            for grid in grids:
+                out.write(grid)
+        with packed.load(self.path('easy.sdkp')) as records:
+            boards = vectorized.from_digits(records.digits())
+        self.assertTrue((boards == vectorized.from_grids(grids)).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Search a single puzzle on several cores.
+
+The top of the search tree is expanded in this process, branching on the
+box with the fewest candidates level by level until there are enough open
+subtrees to keep every worker busy. Each subtree is then searched by the
+trail search in a worker process, with the branching heuristics solve()
+uses. A shared event is the cancel token of
+every worker's Search, so once one subtree yields a solution (or, when
+counting, once the limit is reached) the others stop at their next node.
+
+Subtrees are searched in whatever order the workers finish them, so a
+puzzle with several solutions may give a different one than search_trail.
+"""
+import os
+from multiprocessing import Event, Pool
+
+import bitboard
+import heuristics
+from topology import DIAGONAL_9X9
+
+# Set in each worker by _init_worker
+_cancel = None
+
+
+def split(board, tasks, topo=DIAGONAL_9X9):
+    """Expand the top of the search tree into at least tasks subtrees.
+
+    Args:
+        board: Sudoku as a list of masks.
+        tasks: number of subtrees to aim for; fewer come back when the
+            tree is smaller than that.
+    Returns:
+        A list of propagated boards, solved ones included, whose solutions
+        are together exactly those of board; empty if board has none.
+    """
+    bit_count = topo.bit_count
+    board = bitboard.propagate(list(board), topo=topo)
+    frontier = [] if board is False else [board]
+    while len(frontier) < tasks:
+        expanded = []
+        for node in frontier:
+            box_space = [(bit_count[mask], box) for box, mask in enumerate(node)
+                         if bit_count[mask] > 1]
+            if not box_space:
+                expanded.append(node)
+                continue
+            _, box = min(box_space)
+            for bit in topo.digit_bits:
+                if node[box] & bit:
+                    child = node[:]
+                    child[box] = bit
+                    if bitboard.propagate(child, [box], topo=topo) is not False:
+                        expanded.append(child)
+        if expanded == frontier:
+            break
+        frontier = expanded
+    return frontier
+
+
+def _init_worker(cancel):
+    global _cancel
+    _cancel = cancel
+
+
+def _search_subtree(task):
+    # (solutions found up to limit, first solution or None)
+    board, limit, topo = task
+    count, first = 0, None
+    engine = bitboard.Search(board, cancel=_cancel, topo=topo, variable=heuristics.MRVDegree(),
+                             value=heuristics.least_constraining)
+    for solved in engine.solutions():
+        if first is None:
+            first = list(solved)
+        count += 1
+        if count == limit:
+            break
+    return count, first
+
+
+def _run(board, limit, workers, tasks, topo):
+    # Yield (count, first solution) per subtree until the caller stops reading
+    workers = workers or os.cpu_count() or 1
+    subtrees = split(board, tasks or 4 * workers, topo)
+    if not subtrees:
+        return
+    cancel = Event()
+    with Pool(workers, initializer=_init_worker, initargs=(cancel,)) as pool:
+        try:
+            for result in pool.imap_unordered(_search_subtree,
+                                              [(subtree, limit, topo) for subtree in subtrees]):
+                yield result
+        finally:
+            cancel.set()
+
+
+def search_parallel(board, workers=None, tasks=None, topo=DIAGONAL_9X9):
+    """Find one solution of board using worker processes.
+
+    Args:
+        board: Sudoku as a list of masks.
+        workers: number of processes; None uses every core.
+        tasks: subtrees to split the search into; four per worker when None.
+    Returns:
+        The solved board, or False if the board has no solution.
+    """
+    for _, first in _run(board, 1, workers, tasks, topo):
+        if first is not None:
+            return first
+    return False
+
+
+def count_parallel(board, limit=None, workers=None, tasks=None, topo=DIAGONAL_9X9):
+    """Count the solutions of board using worker processes.
+
+    Every subtree is counted up to limit and the counts are added up; the
+    workers are cancelled as soon as the total reaches limit.
+
+    Returns:
+        The number of solutions found, at most limit.
+    """
+    if limit is not None and limit <= 0:
+        return 0
+    count = 0
+    for found, _ in _run(board, limit, workers, tasks, topo):
+        count += found
+        if limit is not None and count >= limit:
+            return limit
+    return count
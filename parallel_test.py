@@ -0,0 +1,35 @@
+import unittest
+
+import benchmark
+import bitboard
+import parallel
+import solution
+import solution_test
+
+
+class TestParallel(unittest.TestCase):
+    two_solution_grid = solution_test.TestCountSolutions.two_solution_grid
+
+    def board(self, grid):
+        return bitboard.from_values(solution.grid_values(grid))
+
+    def test_split_keeps_solutions(self):
+        subtrees = parallel.split(self.board('2' + '.' * 80), 20)
+        self.assertGreaterEqual(len(subtrees), 20)
+        self.assertEqual(sum(bitboard.count_solutions(subtree, limit=5) for subtree in subtrees[:3]), 15)
+        subtrees = parallel.split(self.board(self.two_solution_grid), 8)
+        self.assertEqual(sum(bitboard.count_solutions(subtree) for subtree in subtrees), 2)
+        self.assertEqual(parallel.split(self.board('11' + '.' * 79), 8), [])
+
+    def test_search(self):
+        grid = solution_test.TestTrace.sparse_grid
+        self.assertTrue(benchmark.is_valid_solution(grid, solution.solve(grid, engine='parallel')))
+        self.assertFalse(parallel.search_parallel(self.board('11' + '.' * 79), workers=2))
+
+    def test_count(self):
+        self.assertEqual(solution.count_solutions(self.two_solution_grid, workers=2), 2)
+        self.assertEqual(parallel.count_parallel(self.board('2' + '.' * 80), limit=50, workers=2), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+"""Serve puzzle solving over a line-based TCP protocol on localhost.
+
+Usage:
+    python service.py --port 8765 --workers 4 --max-queue 64 --timeout 5
+
+Each request is one line and gets one reply line, in order:
+
+    <81-character grid>   solved grid, UNSOLVABLE or INVALID as in cli.py,
+                          BUSY when the queue is full, or TIMEOUT when the
+                          solve took longer than the request timeout
+    METRICS               one line of JSON with queue depth, counts,
+                          latency percentiles and throughput
+
+Solves run in a process pool fed from a bounded queue by one dispatcher per
+worker, so at most one solve per worker is in flight and at most max_queue
+more wait; anything beyond that is turned away at once instead of queueing
+without bound. Each solve carries its remaining time budget into the worker
+as a search deadline, so a timed out request frees its worker as well.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import benchmark
+import cli
+
+BUSY = 'BUSY'
+TIMEOUT = cli.TIMEOUT
+METRICS = 'METRICS'
+
+
+def solve_line(line, seconds=None):
+    """Solve one puzzle line within seconds and return the reply line."""
+    return cli.solve_line(line, None if seconds is None else time.monotonic() + seconds)
+
+
+class SolveService:
+    """Bounded queue of solve requests in front of a process pool.
+
+    Args:
+        workers: worker processes; None uses every core.
+        max_queue: requests allowed to wait for a worker before new ones
+            are rejected with BUSY.
+        timeout: seconds a request may take from arrival to reply.
+        window: number of recent replies the latency percentiles cover.
+    """
+
+    def __init__(self, workers=None, max_queue=64, timeout=10.0, window=1000):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(self.workers)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.counts = {'accepted': 0, 'rejected': 0, 'completed': 0, 'timeouts': 0}
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.started = time.monotonic()
+        self.server = None
+        self.port = None
+        self._queue = None
+        self._dispatchers = []
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Start the dispatchers and listen on host:port (0 picks a port)."""
+        self._queue = asyncio.Queue(self.max_queue)
+        self._dispatchers = [asyncio.ensure_future(self._dispatch()) for _ in range(self.workers)]
+        self.server = await asyncio.start_server(self._handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def close(self):
+        """Stop listening, cancel the dispatchers and shut the pool down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def submit(self, line):
+        """Queue one puzzle line and return its reply line."""
+        loop = asyncio.get_running_loop()
+        arrived = loop.time()
+        reply = loop.create_future()
+        try:
+            self._queue.put_nowait((line, arrived + self.timeout, reply))
+        except asyncio.QueueFull:
+            self.counts['rejected'] += 1
+            return BUSY
+        self.counts['accepted'] += 1
+        try:
+            result = await asyncio.wait_for(reply, self.timeout)
+        except asyncio.TimeoutError:
+            result = TIMEOUT
+        if result == TIMEOUT:
+            self.counts['timeouts'] += 1
+        else:
+            self.counts['completed'] += 1
+        self.latencies.append(loop.time() - arrived)
+        return result
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            line, deadline, reply = await self._queue.get()
+            remaining = deadline - loop.time()
+            # the caller stopped waiting while this sat in the queue
+            if reply.done() or remaining <= 0:
+                continue
+            self.in_flight += 1
+            try:
+                result = await loop.run_in_executor(self.executor, solve_line, line, remaining)
+            except Exception as error:
+                if not reply.done():
+                    reply.set_exception(error)
+            else:
+                if not reply.done():
+                    reply.set_result(result)
+            finally:
+                self.in_flight -= 1
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode('ascii', 'replace').strip()
+                if not line:
+                    continue
+                if line.upper() == METRICS:
+                    reply = json.dumps(self.metrics(), sort_keys=True)
+                else:
+                    reply = await self.submit(line)
+                writer.write(reply.encode('ascii') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def metrics(self):
+        """Return queue depth, request counts, latency and throughput."""
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        metrics = dict(self.counts)
+        metrics.update({
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'max_queue': self.max_queue,
+            'in_flight': self.in_flight,
+            'workers': self.workers,
+            'uptime_sec': uptime,
+            'throughput_per_sec': self.counts['completed'] / uptime if uptime else 0.0,
+            'latency_ms': {name: 1000 * benchmark.percentile(latencies, fraction)
+                           for name, fraction in (('p50', 0.5), ('p90', 0.9),
+                                                  ('p99', 0.99), ('max', 1.0))},
+        })
+        return metrics
+
+
+async def serve(host='127.0.0.1', port=8765, workers=None, max_queue=64, timeout=10.0):
+    """Run a SolveService until cancelled."""
+    service = SolveService(workers, max_queue, timeout)
+    server = await service.start(host, port)
+    print("solving on {}:{} with {} workers".format(host, service.port, service.workers),
+          file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve diagonal sudoku solving over TCP.")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="port to listen on (default 8765)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="worker processes (default: every core)")
+    parser.add_argument('--max-queue', type=int, default=64,
+                        help="requests waiting for a worker before rejecting (default 64)")
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help="seconds per request (default 10)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_queue, args.timeout))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
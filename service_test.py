@@ -0,0 +1,61 @@
+import asyncio
+import json
+import unittest
+
+import benchmark
+import cli
+import service
+import solution
+import solution_test
+
+
+class TestSolveService(unittest.TestCase):
+    diagonal = solution_test.TestDiagonalSudoku
+    solved_line = ''.join(map(diagonal.solved_diag_sudoku.get, solution.BOXES))
+    hard = benchmark.load_corpus(['hard'])['hard']
+
+    def exchange(self, lines, connections=1, **kwargs):
+        # send lines over several connections at once, return replies and metrics
+        async def client(port, lines):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            replies = []
+            for line in lines:
+                writer.write(line.encode('ascii') + b'\n')
+                await writer.drain()
+                replies.append((await reader.readline()).decode('ascii').strip())
+            writer.close()
+            return replies
+
+        async def run():
+            solver = service.SolveService(**kwargs)
+            await solver.start()
+            try:
+                batches = await asyncio.gather(*(client(solver.port, lines)
+                                                 for _ in range(connections)))
+                metrics = json.loads((await client(solver.port, [service.METRICS]))[0])
+            finally:
+                await solver.close()
+            return batches, metrics
+        return asyncio.run(run())
+
+    def test_replies(self):
+        batches, metrics = self.exchange([self.diagonal.diagonal_grid, '11' + '.' * 79, 'not a grid'],
+                                         workers=1)
+        self.assertEqual(batches, [[self.solved_line, cli.UNSOLVABLE, cli.INVALID]])
+        self.assertEqual((metrics['accepted'], metrics['completed'], metrics['queue_depth']), (3, 3, 0))
+        self.assertGreater(metrics['latency_ms']['max'], 0)
+
+    def test_rejects_when_full(self):
+        batches, metrics = self.exchange(self.hard[:1], connections=4, workers=1, max_queue=1)
+        replies = [reply for batch in batches for reply in batch]
+        self.assertIn(service.BUSY, replies)
+        self.assertEqual(metrics['rejected'], replies.count(service.BUSY))
+
+    def test_timeout(self):
+        batches, metrics = self.exchange(self.hard[:2], workers=1, timeout=0.005)
+        self.assertEqual(batches, [[service.TIMEOUT, service.TIMEOUT]])
+        self.assertEqual(metrics['timeouts'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,15 @@
-from heapq import heappush, heappop
+from collections import deque
+from contextvars import ContextVar
+import time
 
-assignments = []
+import bitboard
+import dlx
+import heuristics
+import parallel
+
+# Trace of the solve in progress, set only while solve() records one. A
+# context variable, so solves on other threads never record into it.
+_trace = ContextVar('trace', default=None)
 
 
 # lambda function for extrapolating diagonals
@@ -24,19 +33,148 @@ DIAGONAL_UNITS = [parallel_concat(ROWS, COLS),
 UNITLIST = ROW_UNITS + COLUMN_UNITS + SQUARE_UNITS + DIAGONAL_UNITS
 UNITS = dict((s, [u for u in UNITLIST if s in u]) for s in BOXES)
 PEERS = dict((s, set(sum(UNITS[s], []))-set([s])) for s in BOXES)
+BOX_INDEX = dict((s, i) for i, s in enumerate(BOXES))
+
+# Trace records are (box index, candidates) pairs or one of these markers
+BRANCH = (-1, '')
+BACKTRACK = (-2, '')
+
+
+class Trace:
+    """Compact record of the assignments made during one solve.
+
+    Each change is stored as a (box index, new candidates) pair, and the
+    search adds BRANCH before trying a value and BACKTRACK when that value
+    fails, so frames() can rebuild every board from the deltas alone.
+
+    Args:
+        maxlen: keep only the newest maxlen records in memory. Older
+            records are folded into a base board so frames() still
+            starts from a correct state.
+        stream: text file to write records to instead of keeping them;
+            read it back with trace_frames().
+    Raises:
+        ValueError: if maxlen is less than 1.
+    """
+
+    def __init__(self, maxlen=None, stream=None):
+        if maxlen is not None and maxlen < 1:
+            raise ValueError("maxlen must be at least 1")
+        self.maxlen = maxlen
+        self.stream = stream
+        self.records = deque(maxlen=maxlen)
+        self._base = None
+        self._base_stack = []
+
+    def start(self, values):
+        """Begin the trace at the given board."""
+        self._base = [values[box] for box in BOXES]
+        self._base_stack = []
+        self.records.clear()
+        if self.stream is not None:
+            self.stream.write(' '.join(self._base) + '\n')
+
+    def record(self, index, value):
+        if self.stream is not None:
+            self.stream.write('{} {}\n'.format(index, value) if index >= 0
+                              else '{}\n'.format(index))
+            return
+        if len(self.records) == self.maxlen:
+            # about to be evicted: apply it to the base board instead
+            _apply(self.records[0], self._base, self._base_stack)
+        self.records.append((index, value))
+
+    def branch(self):
+        self.record(*BRANCH)
+
+    def backtrack(self):
+        self.record(*BACKTRACK)
+
+    def frames(self):
+        """Yield the board in dictionary form after each box is solved."""
+        return _replay(self.records, self._base[:],
+                       [state[:] for state in self._base_stack])
+
+    def changes(self):
+        """Like frames(), but yield (state, before) deltas as _replay_changes does."""
+        return _replay_changes(self.records, self._base[:],
+                               [state[:] for state in self._base_stack])
+
+
+def _apply(record, state, stack):
+    index, value = record
+    if index >= 0:
+        state[index] = value
+    elif record == BRANCH:
+        stack.append(state[:])
+    else:
+        state[:] = stack.pop()
+
+
+def _replay_changes(records, state, stack):
+    """Apply records to state, yielding after each record that solves a box.
+
+    Yields (state, before): state is the same list of candidate strings
+    every time, updated in place, and before maps the index of each box
+    changed since the previous yield to its value back then. Nothing is
+    copied per step except the snapshot BRANCH pushes, so a replay takes
+    memory for the search depth, not for the number of steps.
+    """
+    before = {}
+    for record in records:
+        index, value = record
+        if index >= 0:
+            if index not in before:
+                before[index] = state[index]
+            state[index] = value
+        elif record == BRANCH:
+            stack.append(state[:])
+        else:
+            restored = stack.pop()
+            for i, old in enumerate(state):
+                if old != restored[i] and i not in before:
+                    before[i] = old
+            state[:] = restored
+        if index >= 0 and len(value) == 1:
+            yield state, before
+            before = {}
+
+
+def _replay(records, state, stack):
+    for state, _ in _replay_changes(records, state, stack):
+        yield dict(zip(BOXES, state))
+
+
+def trace_changes(stream):
+    """Yield the (state, before) deltas of a trace file written by Trace(stream=...)."""
+    state = stream.readline().split()
+
+    def records():
+        for line in stream:
+            index, _, value = line.rstrip('\n').partition(' ')
+            yield int(index), value
+    return _replay_changes(records(), state, [])
+
+
+def trace_frames(stream):
+    """Yield the boards recorded in a trace file written by Trace(stream=...)."""
+    for state, _ in trace_changes(stream):
+        yield dict(zip(BOXES, state))
+
 
 def assign_value(values, box, value):
     """
     Assigns a value to a given box. If it updates the board record it.
     """
 
-    # Don't waste memory appending actions that don't change any values
+    # Don't waste memory recording actions that don't change any values
     if values[box] == value:
         return values
 
     values[box] = value
-    if len(value) == 1:
-        assignments.append(values.copy())
+    trace = _trace.get()
+    if trace is not None:
+        trace.record(BOX_INDEX[box], value)
     return values
 
 
@@ -106,20 +244,19 @@ def grid_values(grid):
             Keys: The boxes, e.g., 'A1'
             Values: The value in each box, e.g., '8'. If the box has no value,
                     then the value will be '123456789'.
+    Raises:
+        ValueError: if the grid does not hold exactly 81 boxes.
     """
     # remove all whitespace, \t and \n inclusive
-    grid = grid.join(grid.split())
-    # assert length of input is valid
-    assert len(grid) == 81, "Sudoku grid is an invalid length"
+    grid = ''.join(grid.split())
+    # a ValueError, unlike an assert, still fires under python -O
+    if len(grid) != 81:
+        raise ValueError("Sudoku grid is an invalid length")
 
     # process string into dict where '.' means all digits are valid
-    # otherwise, the given digit
-    values = {box: grid[index] if grid[index] in DIGITS else DIGITS
-              for index, box in enumerate(BOXES)}
-
-    for box, value in values.items():
-        values = assign_value(values, box, value)
-    return values
+    # otherwise, the given digit; nothing is recorded in a trace here
+    return {box: grid[index] if grid[index] in DIGITS else DIGITS
+            for index, box in enumerate(BOXES)}
 
 
 def display(values):
@@ -177,25 +314,93 @@ def only_choice(values):
     return values
 
 
+class Pipeline:
+    """Constraint propagation as stages of strategies, cheapest stage first.
+
+    Strategies run one at a time, and as soon as one removes a candidate
+    propagation starts over from the first strategy of the first stage; a
+    later strategy, and above all a later stage, only runs once everything
+    before it has stalled. Propagation stops when a full pass removes
+    nothing, the same fixpoint as running every strategy on every pass,
+    reached with far fewer calls of the expensive ones.
+
+    Strategies run in the order they were given in, so the same board is
+    always propagated the same way. With adaptive=True each run instead
+    orders every stage by hit rate so far, highest first, ties keeping the
+    given order; the order is fixed when the run starts, so it then
+    depends on what the pipeline propagated before.
+
+    Args:
+        stages: list of lists of strategies, each a name from STRATEGIES
+            or a function taking and returning the dictionary form.
+        adaptive(bool): reorder each stage by hit rate at every run.
+    Attributes:
+        counters(dict): bitboard.StrategyStats per strategy name, kept
+            across every run of the pipeline, as solve(stats=...) keeps
+            them for the bitmask engine.
+    """
+
+    def __init__(self, stages, adaptive=False):
+        self.adaptive = adaptive
+        self.stages = [[(strategy, STRATEGIES[strategy]) if isinstance(strategy, str)
+                        else (strategy.__name__, strategy) for strategy in stage]
+                       for stage in stages]
+        self.counters = {name: bitboard.StrategyStats()
+                         for stage in self.stages for name, _ in stage}
+
+    def __call__(self, values):
+        """Propagate values until no strategy makes progress.
+
+        Returns:
+            The reduced dictionary form, or False once a box has no
+            candidates left.
+        """
+        counters = self.counters
+        stages = self.stages
+        if self.adaptive:
+            stages = [sorted(stage, key=lambda entry: counters[entry[0]].hit_rate, reverse=True)
+                      for stage in stages]
+        candidates = sum(map(len, values.values()))
+        level = 0
+        while level < len(stages):
+            for name, strategy in stages[level]:
+                started = time.perf_counter()
+                values = strategy(values)
+                counter = counters[name]
+                counter.seconds += time.perf_counter() - started
+                counter.calls += 1
+                remaining = sum(map(len, values.values()))
+                if remaining < candidates:
+                    counter.hits += 1
+                    counter.eliminations += candidates - remaining
+                    candidates = remaining
+                    if '' in values.values():
+                        return False
+                    level = -1
+                    break
+            level += 1
+        return values
+
+    def as_dict(self):
+        """Return each strategy's counters, shaped like SearchStats.as_dict()['strategies']."""
+        return {name: counter.as_dict() for name, counter in self.counters.items()}
+
+
+# Propagation strategies by name, for Pipeline stages
+STRATEGIES = {'eliminate': eliminate, 'only_choice': only_choice, 'naked_twins': naked_twins}
+
+# naked twins compares every pair of two-candidate peers, so it only runs
+# once eliminate and only choice have stalled
+PIPELINE = Pipeline([['eliminate', 'only_choice'], ['naked_twins']])
+
+
 def reduce_puzzle(values):
-    stalled = False
-    while not stalled:
-        # Check how many boxes have a determined value
-        solved_values_before = len([box for box, value in values.items()
-                                    if len(value) == 1])
-
-        values = eliminate(values)
-        values = only_choice(values)
-        values = naked_twins(values)
-        # Check how many boxes have a determined value, to compare
-        solved_values_after = len([box for box, value in values.items()
-                                   if len(value) == 1])
-        # If no new values were added, stop the loop.
-        stalled = solved_values_before == solved_values_after
-        # Return False if there is a box with zero available values:
-        if len([box for box in values.keys() if len(values[box]) == 0]):
-            return False
-    return values
+    """
+    Apply the PIPELINE strategies until none of them makes progress.
+    Returns:
+        The reduced dictionary form, or False if a box has no values left.
+    """
+    return PIPELINE(values)
 
 
 def search(values):
@@ -208,48 +413,163 @@ def search(values):
         return False
 
     # Choose one of the unfilled squares with the fewest possibilities
-    min_heap = []
-    box_space = [box for box in BOXES if len(values[box]) > 1]
+    box_space = [(len(values[box]), box) for box in BOXES if len(values[box]) > 1]
 
     # if no box space, all boxes are filled, so return
     if not box_space:
         return values
-    # otherwise, push boxes onto min heap
-    # key value for heap property is num of valid digits for a box
-    for box in box_space:
-        heappush(min_heap, (len(values[box]), box))
 
     # Now use recursion to solve each one of the resulting sudokus,
     # and if one returns a value (not False), return that answer!
-    _, temp_box = heappop(min_heap)
+    # a single min() picks the same box a freshly built heap would pop
+    _, temp_box = min(box_space)
+    trace = _trace.get()
     for value in values[temp_box]:
         temp_sudoku = values.copy()
-        temp_sudoku[temp_box] = value
+        if trace is not None:
+            trace.branch()
+        temp_sudoku = assign_value(temp_sudoku, temp_box, value)
         attempt = search(temp_sudoku)
         if attempt:
             return attempt
-    return
+        if trace is not None:
+            trace.backtrack()
+    return False
+
 
+def _search_limited(board, stats=None, topo=bitboard.DIAGONAL_9X9, **limits):
+    # fewest candidates first, ties to the most open peers, least
+    # constraining digit first: about a third of the nodes of plain MRV
+    return bitboard.search_limited(board, stats=stats, topo=topo,
+                                   variable=heuristics.MRVDegree(),
+                                   value=heuristics.least_constraining, **limits)
 
-def solve(grid):
+
+def _search_bitmask(board, stats=None, topo=bitboard.DIAGONAL_9X9):
+    result = _search_limited(board, stats, topo)
+    return result.solution if result.status == bitboard.SOLVED else False
+
+
+def solve(grid, engine='bitmask', trace=None, topology=None, stats=None):
     """
     Find the solution to a Sudoku grid.
     Args:
         grid(string): a string representing a sudoku grid.
+        engine(string): 'bitmask' to search over candidate masks, 'dlx' to
+            solve it as an exact-cover problem with dancing links, 'dict'
+            to search over the dictionary form, or 'parallel' to split the
+            bitmask search across every core for a single hard puzzle.
+        trace(Trace): records the assignments of this solve; only the
+            'dict' engine can record one.
+        topology(Topology): board shape for grids other than the 9x9
+            diagonal sudoku, e.g. topology.get_topology(4) for 16x16;
+            solved with the 'bitmask' engine.
+        stats(bitboard.SearchStats): filled in with per-strategy calls,
+            time and eliminations plus search nodes, backtracks and
+            maximum depth; only the 'bitmask' engine collects them.
     Returns:
         The dictionary representation of the final sudoku grid.
         False if no solution exists.
     """
+    if stats is not None and engine != 'bitmask':
+        raise ValueError("Only the 'bitmask' engine collects stats")
+    if topology is not None:
+        if engine != 'bitmask' or trace is not None:
+            raise ValueError("Other topologies are only solved by the 'bitmask' engine")
+        board = _search_bitmask(bitboard.from_grid(grid, topology), stats, topology)
+        return bitboard.to_values(board, topology) if board else False
     values = grid_values(grid)
-    return search(values)
+    if trace is not None:
+        if engine != 'dict':
+            raise ValueError("Only the 'dict' engine can record a trace")
+        trace.start(values)
+        token = _trace.set(trace)
+        try:
+            return search(values) or False
+        finally:
+            _trace.reset(token)
+    if engine == 'dict':
+        return search(values) or False
+    if engine == 'bitmask':
+        board = _search_bitmask(bitboard.from_values(values), stats)
+        return bitboard.to_values(board) if board else False
+    if engine == 'dlx':
+        board = dlx.search(bitboard.from_values(values))
+        return bitboard.to_values(board) if board else False
+    if engine == 'parallel':
+        board = parallel.search_parallel(bitboard.from_values(values))
+        return bitboard.to_values(board) if board else False
+    raise ValueError("Unknown engine: {!r}".format(engine))
+
+
+def count_solutions(grid, limit=None, workers=1):
+    """
+    Count the solutions of a Sudoku grid.
+    Args:
+        grid(string): a string representing a sudoku grid.
+        limit(int): stop searching once this many solutions are found;
+            None counts every solution.
+        workers(int): processes to split the search across; None uses
+            every core, 1 counts in this process.
+    Returns:
+        The number of solutions, at most limit.
+    """
+    board = bitboard.from_values(grid_values(grid))
+    if workers == 1:
+        return bitboard.count_solutions(board, limit)
+    return parallel.count_parallel(board, limit, workers)
+
+
+def iter_solutions(grid):
+    """
+    Generate the solutions of a Sudoku grid one at a time.
+    Solutions are found lazily by the trail search, so only the current
+    one is held in memory and the caller can stop at any point.
+    Args:
+        grid(string): a string representing a sudoku grid.
+    Yields:
+        The dictionary representation of each solved grid.
+    """
+    board = bitboard.from_values(grid_values(grid))
+    for solved in bitboard.Search(board).solutions():
+        yield bitboard.to_values(solved)
+
+
+def is_unique(grid):
+    """
+    Check whether a Sudoku grid has exactly one solution.
+    The search stops as soon as a second solution turns up.
+    """
+    return count_solutions(grid, limit=2) == 1
+
+
+def solve_limited(grid, max_nodes=None, deadline=None, cancel=None):
+    """
+    Solve a Sudoku grid, giving up once a search limit is reached.
+    Args:
+        grid(string): a string representing a sudoku grid.
+        max_nodes(int): most search nodes to expand, or None for no limit.
+        deadline(float): time.monotonic() value to stop at, or None.
+        cancel: object whose is_set() returns True to stop, or None.
+    Returns:
+        bitboard.SearchResult(status, solution, stats) where status is
+        'solved', 'unsolvable' or 'exhausted' and solution is the solved
+        grid in dictionary form, or None.
+    """
+    board = bitboard.from_values(grid_values(grid))
+    result = _search_limited(board, max_nodes=max_nodes, deadline=deadline, cancel=cancel)
+    if result.solution is None:
+        return result
+    return result._replace(solution=bitboard.to_values(result.solution))
 
 if __name__ == '__main__':
     diag_sudoku_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
-    display(solve(diag_sudoku_grid))
+    trace = Trace()
+    display(solve(diag_sudoku_grid, engine='dict', trace=trace))
 
     try:
         from visualize import visualize_assignments
-        visualize_assignments(assignments)
+        visualize_assignments(trace)
 
     except SystemExit:
         pass
@@ -1,6 +1,19 @@
-import solution
+import ast
+import io
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
 
+import bitboard
+import function
+import solution
+
 
 class TestNakedTwins(unittest.TestCase):
     before_naked_twins_1 = {'I6': '4', 'H9': '3', 'I2': '6', 'E8': '1', 'H3': '5', 'H7': '8', 'I7': '1', 'I4': '8',
@@ -94,5 +107,351 @@ class TestDiagonalSudoku(unittest.TestCase):
     def test_solve(self):
         self.assertEqual(solution.solve(self.diagonal_grid), self.solved_diag_sudoku)
 
+    def test_solve_dict_engine(self):
+        self.assertEqual(solution.solve(self.diagonal_grid, engine='dict'), self.solved_diag_sudoku)
+
+
+class TestDLX(unittest.TestCase):
+
+    def test_solve(self):
+        self.assertEqual(solution.solve(TestDiagonalSudoku.diagonal_grid, engine='dlx'),
+                         TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_sparse_solution_is_valid(self):
+        values = solution.solve('2' + '.' * 80, engine='dlx')
+        self.assertEqual(values['A1'], '2')
+        for unit in solution.UNITLIST:
+            self.assertEqual(sorted(values[box] for box in unit), list(solution.DIGITS))
+
+    def test_unsolvable(self):
+        self.assertFalse(solution.solve('11' + '.' * 79, engine='dlx'))
+
+
+class TestBitboard(unittest.TestCase):
+
+    def test_round_trip(self):
+        values = TestNakedTwins.before_naked_twins_1
+        self.assertEqual(bitboard.to_values(bitboard.from_values(values)), values)
+
+    def test_naked_twins(self):
+        board = bitboard.from_values(TestNakedTwins.before_naked_twins_1)
+        self.assertTrue(bitboard.to_values(bitboard.naked_twins(board)) in TestNakedTwins.possible_solutions_1,
+                        "bitboard.naked_twins produced an unexpected board.")
+
+    def test_naked_twins2(self):
+        board = bitboard.from_values(TestNakedTwins.before_naked_twins_2)
+        self.assertTrue(bitboard.to_values(bitboard.naked_twins(board)) in TestNakedTwins.possible_solutions_2,
+                        "bitboard.naked_twins produced an unexpected board.")
+
+    def test_unit_rules(self):
+        mask = lambda digits: sum(bitboard.DIGIT_MASK[d] for d in digits)
+        row = lambda masks: [mask(digits) for digits in masks] + [bitboard.ALL_DIGITS] * 72
+        unit = bitboard.UNITLIST[0]
+
+        # only choice: 1 fits only in box 0
+        board, trail = row(['12'] + ['23456789'] * 8), []
+        self.assertEqual(bitboard.unit_rules(board, unit, trail), [0])
+        self.assertEqual(board[:9], row(['1'] + ['23456789'] * 8)[:9])
+        self.assertEqual(trail, [(0, mask('12'))])
+
+        # naked twins: 1 and 2 leave every box but 0 and 1
+        board, trail = row(['12', '12'] + ['123456789'] * 7), []
+        self.assertEqual(bitboard.unit_rules(board, unit, trail), list(range(2, 9)))
+        self.assertEqual(board[:9], row(['12', '12'] + ['3456789'] * 7)[:9])
+        self.assertEqual(len(trail), 7)
+
+        # contradictions: 9 fits nowhere, or 1 and 2 both fit only in box 0
+        self.assertIsNone(bitboard.unit_rules(row(['12345678'] * 9), unit))
+        self.assertIsNone(bitboard.unit_rules(row(['123'] + ['3456789'] * 8), unit))
+
+    def test_propagate_matches_solution(self):
+        board = bitboard.propagate(bitboard.from_values(solution.grid_values(TestDiagonalSudoku.diagonal_grid)))
+        solved = bitboard.from_values(TestDiagonalSudoku.solved_diag_sudoku)
+        self.assertTrue(all(mask & digit == digit for mask, digit in zip(board, solved)))
+
+    sparse_grid = '2' + '.' * 80
+
+    def test_search_trail(self):
+        stats = bitboard.SearchStats()
+        board = bitboard.search_trail(bitboard.from_values(solution.grid_values(self.sparse_grid)), stats)
+        self.assertEqual(board, bitboard.search(bitboard.from_values(solution.grid_values(self.sparse_grid))))
+        self.assertGreater(stats.copies_avoided, 0)
+        self.assertGreater(stats.peak_trail, 0)
+
+    def test_propagate_contradiction(self):
+        board = bitboard.from_values(solution.grid_values('11' + '.' * 79))
+        self.assertFalse(bitboard.propagate(board))
+
+    def test_unit_subsets(self):
+        mask = lambda digits: sum(bitboard.DIGIT_MASK[d] for d in digits)
+        # naked triple 123 in boxes 0-2, hidden pair 89 in boxes 3-4
+        row = ['12', '23', '13', '14589', '45689'] + ['14567'] * 4
+        board = [mask(digits) for digits in row] + [bitboard.ALL_DIGITS] * 72
+        before = list(board)
+        trail = []
+        changed = bitboard.unit_subsets(board, bitboard.UNITLIST[0], trail)
+        self.assertEqual(board[:9], [mask(digits) for digits in ['12', '23', '13', '89', '89'] + ['4567'] * 4])
+        self.assertEqual(set(changed), set(range(3, 9)))
+        self.assertEqual(bitboard.undo(board, trail, 0), before)
+
+        # three boxes sharing two digits: the pairs among them strip each
+        # other until all three are empty, and boxes 3-8 end as above
+        board[0] = board[1] = board[2] = mask('12')
+        changed = bitboard.unit_subsets(board, bitboard.UNITLIST[0])
+        self.assertEqual(changed, [0, 3, 5, 6, 7, 8, 2, 1, 3, 4])
+        self.assertEqual(board[:9], [0, 0, 0] + [mask('89')] * 2 + [mask('4567')] * 4)
+
+    def test_subsets_in_search(self):
+        board = bitboard.from_values(solution.grid_values(TestTrace.sparse_grid))
+        plain = bitboard.search_limited(list(board))
+        stats = bitboard.SearchStats()
+        subsets = bitboard.search_limited(list(board), stats=stats, max_subset=4)
+        self.assertEqual(subsets.solution, plain.solution)
+        self.assertLessEqual(subsets.stats.nodes, plain.stats.nodes)
+        self.assertGreater(stats.strategies['subsets'].calls, 0)
+
+class TestTrace(unittest.TestCase):
+    # needs at least one backtrack with the dictionary search
+    sparse_grid = '2..4....9...7..1.3........6.....5...............69.....2.5..6.16........3.5......'
+
+    def test_frames_rebuild_solution(self):
+        trace = solution.Trace()
+        solved = solution.solve(self.sparse_grid, engine='dict', trace=trace)
+        frames = list(trace.frames())
+        self.assertIn(solution.BRANCH, trace.records)
+        self.assertIn(solution.BACKTRACK, trace.records)
+        self.assertEqual(frames[-1], solved)
+
+    def test_ring_buffer_keeps_latest_frames(self):
+        full, ring = solution.Trace(), solution.Trace(maxlen=200)
+        solution.solve(self.sparse_grid, engine='dict', trace=full)
+        solution.solve(self.sparse_grid, engine='dict', trace=ring)
+        self.assertEqual(len(ring.records), 200)
+        ring_frames = list(ring.frames())
+        self.assertEqual(ring_frames, list(full.frames())[-len(ring_frames):])
+
+    def test_ring_buffer_needs_room(self):
+        self.assertRaises(ValueError, solution.Trace, maxlen=0)
+        one = solution.Trace(maxlen=1)
+        self.assertTrue(solution.solve(self.sparse_grid, engine='dict', trace=one))
+        self.assertEqual(len(one.records), 1)
+
+    def test_stream_round_trip(self):
+        memory, stream = solution.Trace(), solution.Trace(stream=io.StringIO())
+        solution.solve(self.sparse_grid, engine='dict', trace=memory)
+        solution.solve(self.sparse_grid, engine='dict', trace=stream)
+        stream.stream.seek(0)
+        self.assertEqual(list(solution.trace_frames(stream.stream)), list(memory.frames()))
+
+    def test_off_by_default(self):
+        solution.solve(self.sparse_grid, engine='dict')
+        self.assertIsNone(solution._trace.get())
+        self.assertRaises(ValueError, solution.solve, self.sparse_grid, trace=solution.Trace())
+
+    def test_scoped_to_one_thread(self):
+        expected = solution.Trace()
+        solution.solve(self.sparse_grid, engine='dict', trace=expected)
+        traced = solution.Trace()
+        started, done = threading.Event(), threading.Event()
+
+        def untraced():
+            started.wait()
+            for _ in range(5):
+                solution.solve(TestDiagonalSudoku.diagonal_grid, engine='dict')
+            done.set()
+
+        def record(index, value, record=traced.record):
+            if not started.is_set() and threading.current_thread() is threading.main_thread():
+                # let the other thread solve while this trace is active
+                started.set()
+                done.wait(10)
+            record(index, value)
+        traced.record = record
+        other = threading.Thread(target=untraced)
+        other.start()
+        solution.solve(self.sparse_grid, engine='dict', trace=traced)
+        done.wait()
+        other.join()
+        self.assertEqual(list(traced.records), list(expected.records))
+
+
+class TestPipeline(unittest.TestCase):
+
+    def full_passes(self, values):
+        # every strategy on every pass until a pass removes nothing
+        while True:
+            before = dict(values)
+            for strategy in (solution.eliminate, solution.only_choice, solution.naked_twins):
+                values = strategy(values)
+            if values == before:
+                return values
+
+    def test_same_fixpoint(self):
+        for grid in (TestDiagonalSudoku.diagonal_grid, TestTrace.sparse_grid):
+            expected = self.full_passes(solution.grid_values(grid))
+            pipeline = solution.Pipeline([['eliminate', 'only_choice'], ['naked_twins']])
+            self.assertEqual(pipeline(solution.grid_values(grid)), expected)
+
+    def test_counters_and_escalation(self):
+        pipeline = solution.Pipeline([['eliminate', 'only_choice'], ['naked_twins']])
+        pipeline(solution.grid_values(TestTrace.sparse_grid))
+        counters = pipeline.counters
+        self.assertGreater(counters['eliminate'].hits, 0)
+        self.assertLessEqual(counters['eliminate'].hits, counters['eliminate'].calls)
+        # naked twins runs only after the first stage has stalled
+        self.assertLess(counters['naked_twins'].calls, counters['eliminate'].calls)
+        self.assertEqual(set(pipeline.as_dict()), {'eliminate', 'only_choice', 'naked_twins'})
+
+    def test_counters_shaped_like_solve_stats(self):
+        pipeline = solution.Pipeline([['eliminate', 'only_choice'], ['naked_twins']])
+        pipeline(solution.grid_values(TestTrace.sparse_grid))
+        stats = bitboard.SearchStats()
+        solution.solve(TestTrace.sparse_grid, stats=stats)
+        strategies = stats.as_dict()['strategies']
+        for name, counters in pipeline.as_dict().items():
+            self.assertEqual(set(counters), set(strategies[name]))
+            self.assertEqual(counters['hit_rate'], counters['hits'] / counters['calls'])
+
+    def test_fixed_order_by_default(self):
+        pipeline = solution.Pipeline([['only_choice', 'eliminate']])
+        pipeline(solution.grid_values(TestTrace.sparse_grid))
+        self.assertEqual([name for name, _ in pipeline.stages[0]], ['only_choice', 'eliminate'])
+
+    def test_adaptive_order(self):
+        pipeline = solution.Pipeline([['only_choice', 'eliminate']], adaptive=True)
+        pipeline.counters['eliminate'].calls = pipeline.counters['eliminate'].hits = 1
+        calls = []
+        pipeline.stages[0] = [(name, lambda values, name=name, strategy=strategy:
+                               calls.append(name) or strategy(values))
+                              for name, strategy in pipeline.stages[0]]
+        pipeline(solution.grid_values(TestDiagonalSudoku.diagonal_grid))
+        self.assertEqual(calls[0], 'eliminate')
+        # the configured order itself is left alone
+        self.assertEqual([name for name, _ in pipeline.stages[0]], ['only_choice', 'eliminate'])
+
+    def test_trace_is_reproducible(self):
+        first = solution.Trace()
+        solution.solve(TestTrace.sparse_grid, engine='dict', trace=first)
+        for grid in (TestDiagonalSudoku.diagonal_grid, TestTrace.sparse_grid):
+            solution.solve(grid, engine='dict')
+        second = solution.Trace()
+        solution.solve(TestTrace.sparse_grid, engine='dict', trace=second)
+        self.assertEqual(list(first.records), list(second.records))
+
+    def test_contradiction(self):
+        values = solution.grid_values('11' + '.' * 79)
+        self.assertIs(solution.reduce_puzzle(values), False)
+
+    def test_function_configuration(self):
+        values = function.reduce_puzzle(solution.grid_values(TestDiagonalSudoku.diagonal_grid))
+        self.assertEqual(values, solution.Pipeline([['eliminate', 'only_choice']])(
+            solution.grid_values(TestDiagonalSudoku.diagonal_grid)))
+        self.assertEqual(set(function.reduce_puzzle.counters), {'eliminate', 'only_choice'})
+
+
+class TestCountSolutions(unittest.TestCase):
+
+    def test_unique(self):
+        self.assertTrue(solution.is_unique(TestDiagonalSudoku.diagonal_grid))
+        self.assertEqual(solution.count_solutions(TestDiagonalSudoku.diagonal_grid), 1)
+
+    def test_limit(self):
+        self.assertFalse(solution.is_unique('2' + '.' * 80))
+        self.assertEqual(solution.count_solutions('2' + '.' * 80, limit=5), 5)
+        self.assertEqual(solution.count_solutions('2' + '.' * 80, limit=0), 0)
+
+    def test_unsolvable(self):
+        self.assertFalse(solution.is_unique('11' + '.' * 79))
+        self.assertEqual(solution.count_solutions('11' + '.' * 79), 0)
+
+    two_solution_grid = '26..4...185.....49.9....5....64..1......9.6....9657....4...98......81764..856.92.'
+
+    def test_two_solutions(self):
+        grid = self.two_solution_grid
+        self.assertEqual(solution.count_solutions(grid), 2)
+        self.assertEqual(solution.count_solutions(grid, limit=1), 1)
+        self.assertFalse(solution.is_unique(grid))
+
+
+class TestIterSolutions(unittest.TestCase):
+
+    def test_lazy_and_distinct(self):
+        solutions = solution.iter_solutions('2' + '.' * 80)
+        first = list(itertools.islice(solutions, 20))
+        solutions.close()
+        self.assertEqual(len(first), 20)
+        self.assertEqual(len({tuple(sorted(values.items())) for values in first}), 20)
+        self.assertTrue(all(values['A1'] == '2' for values in first))
+
+    def test_matches_count(self):
+        grid = TestCountSolutions.two_solution_grid
+        self.assertEqual(len(list(solution.iter_solutions(grid))), solution.count_solutions(grid))
+        self.assertEqual(list(solution.iter_solutions(TestDiagonalSudoku.diagonal_grid)),
+                         [TestDiagonalSudoku.solved_diag_sudoku])
+
+
+class TestSolveStats(unittest.TestCase):
+
+    def test_counters(self):
+        stats = bitboard.SearchStats()
+        self.assertEqual(solution.solve(TestTrace.sparse_grid, stats=stats),
+                         solution.solve(TestTrace.sparse_grid))
+        self.assertEqual(set(stats.strategies), {'eliminate', 'only_choice', 'naked_twins'})
+        self.assertTrue(all(counter.calls > 0 for counter in stats.strategies.values()))
+        self.assertGreater(stats.strategies['eliminate'].eliminations, 0)
+        self.assertGreater(stats.nodes, 1)
+        self.assertGreater(stats.max_depth, 0)
+        self.assertEqual(stats.as_dict()['nodes'], stats.nodes)
+
+    def test_off_by_default(self):
+        result = solution.solve_limited(TestTrace.sparse_grid)
+        self.assertEqual(result.stats.strategies, {})
+        self.assertRaises(ValueError, solution.solve, TestTrace.sparse_grid, engine='dlx',
+                          stats=bitboard.SearchStats())
+
+
+class TestSolveLimited(unittest.TestCase):
+
+    def test_solved(self):
+        result = solution.solve_limited(TestDiagonalSudoku.diagonal_grid)
+        self.assertEqual(result.status, bitboard.SOLVED)
+        self.assertEqual(result.solution, TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_unsolvable(self):
+        result = solution.solve_limited('11' + '.' * 79)
+        self.assertEqual(result.status, bitboard.UNSOLVABLE)
+        self.assertIsNone(result.solution)
+
+    def test_node_budget(self):
+        result = solution.solve_limited(TestBitboard.sparse_grid, max_nodes=1)
+        self.assertEqual(result.status, bitboard.EXHAUSTED)
+        self.assertEqual(result.stats.nodes, 1)
+
+    def test_deadline_and_cancel(self):
+        self.assertEqual(solution.solve_limited(TestBitboard.sparse_grid, deadline=time.monotonic()).status,
+                         bitboard.EXHAUSTED)
+        cancel = threading.Event()
+        cancel.set()
+        self.assertEqual(solution.solve_limited(TestBitboard.sparse_grid, cancel=cancel).status,
+                         bitboard.EXHAUSTED)
+
+
+
+class TestSubmission(unittest.TestCase):
+    root = os.path.dirname(os.path.abspath(__file__))
+
+    def test_submitted_files_solve_alone(self):
+        with open(os.path.join(self.root, '.udacity-pa', 'projects.py')) as f:
+            source = f.read()
+        filenames = next(ast.literal_eval(node.value) for node in ast.walk(ast.parse(source))
+                         if isinstance(node, ast.Assign) and node.targets[0].id == 'filenames')
+        with tempfile.TemporaryDirectory() as directory:
+            for name in filenames:
+                shutil.copy(os.path.join(self.root, name), directory)
+            check = "import solution; assert solution.solve({!r})".format(
+                TestDiagonalSudoku.diagonal_grid)
+            subprocess.run([sys.executable, '-c', check], cwd=directory, check=True)
+
+
 if __name__ == '__main__':
     unittest.main()
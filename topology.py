@@ -0,0 +1,119 @@
+"""Board topologies for N^2 x N^2 sudoku with optional diagonal units.
+
+A Topology holds the integer index tables the bitmask engine runs on: the
+boxes of every unit, the units and peers of every box, and lookup tables for
+candidate masks. Boxes are numbered row-major, so box ``r * size + c`` is
+named by row letter ``r`` and column number ``c + 1`` ('A1' .. 'I9' on the
+classic board, 'A1' .. 'P16' on a 16x16 board).
+
+Building the tables costs a few milliseconds, so get_topology caches one
+instance per shape.
+"""
+from functools import lru_cache
+
+ROW_NAMES = 'ABCDEFGHIJKLMNOPQRSTUVWXY'
+SYMBOLS = '123456789ABCDEFGHIJKLMNOP'
+
+# Largest digit count that still gets flat lookup tables (2 ** 16 entries)
+_MAX_TABLE_DIGITS = 16
+
+
+class _BitCount:
+    """Stands in for a popcount table when the table would be too large."""
+
+    def __getitem__(self, mask):
+        return bin(mask).count('1')
+
+
+class _OpenCount:
+    """Stands in for an open-count table when the table would be too large."""
+
+    def __init__(self, size):
+        self.size = size
+
+    def __getitem__(self, mask):
+        count = bin(mask).count('1')
+        return count if count > 1 else self.size + 1
+
+
+class _MaskDigits:
+    """Stands in for a mask-to-digits table when the table would be too large."""
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+
+    def __getitem__(self, mask):
+        return ''.join(s for i, s in enumerate(self.symbols) if mask >> i & 1)
+
+
+class Topology:
+    """Index tables for a board of box_size^2 x box_size^2 boxes.
+
+    Args:
+        box_size: side of a square unit, 3 for the classic 9x9 board.
+        diagonal: whether the two main diagonals are units as well.
+    """
+
+    def __init__(self, box_size=3, diagonal=True):
+        if not 2 <= box_size <= 5:
+            raise ValueError("box_size must be between 2 and 5")
+        n = box_size * box_size
+        self.box_size = box_size
+        self.diagonal = diagonal
+        self.size = n
+        self.cells = n * n
+
+        self.digits = SYMBOLS[:n]
+        self.rows = ROW_NAMES[:n]
+        self.boxes = [r + str(c + 1) for r in self.rows for c in range(n)]
+        self.box_index = {box: index for index, box in enumerate(self.boxes)}
+
+        # Candidate masks and the lookup tables used to read them back
+        # open_count is the candidate count of an open box and size + 1 for
+        # a solved one, so the smallest entry over a board is the box to
+        # branch on
+        self.all_digits = (1 << n) - 1
+        self.digit_bits = [1 << i for i in range(n)]
+        self.digit_mask = {digit: 1 << i for i, digit in enumerate(self.digits)}
+        if n <= _MAX_TABLE_DIGITS:
+            self.bit_count = [bin(mask).count('1') for mask in range(self.all_digits + 1)]
+            self.open_count = [count if count > 1 else n + 1 for count in self.bit_count]
+            self.mask_digits = [''.join(d for i, d in enumerate(self.digits) if mask >> i & 1)
+                                for mask in range(self.all_digits + 1)]
+        else:
+            self.bit_count = _BitCount()
+            self.open_count = _OpenCount(n)
+            self.mask_digits = _MaskDigits(self.digits)
+
+        # Building unitlist for rows, columns, squares, and diagonals
+        b = box_size
+        self.row_units = [tuple(r * n + c for c in range(n)) for r in range(n)]
+        self.column_units = [tuple(r * n + c for r in range(n)) for c in range(n)]
+        self.square_units = [tuple(r * n + c for r in range(rs, rs + b) for c in range(cs, cs + b))
+                             for rs in range(0, n, b) for cs in range(0, n, b)]
+        self.diagonal_units = [tuple(i * n + i for i in range(n)),
+                               tuple((n - 1 - i) * n + i for i in range(n))] if diagonal else []
+        self.unitlist = (self.row_units + self.column_units + self.square_units
+                         + self.diagonal_units)
+
+        # One pass over the units instead of scanning every unit per box
+        units = [[] for _ in range(self.cells)]
+        for u, unit in enumerate(self.unitlist):
+            for box in unit:
+                units[box].append(u)
+        self.units = [tuple(box_units) for box_units in units]
+        self.peer_sets = [frozenset(box for u in self.units[index] for box in self.unitlist[u]) - {index}
+                          for index in range(self.cells)]
+        self.peers = [tuple(sorted(peers)) for peers in self.peer_sets]
+
+    def __repr__(self):
+        return 'Topology(box_size={}, diagonal={})'.format(self.box_size, self.diagonal)
+
+
+@lru_cache(maxsize=None)
+def get_topology(box_size=3, diagonal=True):
+    """Return the shared Topology for this shape, building it on first use."""
+    return Topology(box_size, diagonal)
+
+
+DIAGONAL_9X9 = get_topology(3, True)
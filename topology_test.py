@@ -0,0 +1,33 @@
+import unittest
+
+import solution
+from topology import get_topology, DIAGONAL_9X9
+
+
+class TestTopology(unittest.TestCase):
+
+    def test_matches_solution_tables(self):
+        topo = DIAGONAL_9X9
+        self.assertEqual(topo.boxes, solution.BOXES)
+        self.assertEqual([[topo.boxes[box] for box in unit] for unit in topo.unitlist], solution.UNITLIST)
+        for index, box in enumerate(topo.boxes):
+            self.assertEqual({topo.boxes[peer] for peer in topo.peers[index]}, solution.PEERS[box])
+
+    def test_cached(self):
+        self.assertIs(get_topology(4, diagonal=False), get_topology(4, diagonal=False))
+        self.assertIsNot(get_topology(4, diagonal=False), get_topology(4, diagonal=True))
+
+    def test_solve_16x16(self):
+        topo = get_topology(4)
+        values = solution.solve('.' * topo.cells, topology=topo)
+        for unit in topo.unitlist:
+            self.assertEqual(sorted(values[topo.boxes[box]] for box in unit), sorted(topo.digits))
+
+    def test_sizes(self):
+        self.assertEqual(get_topology(5, diagonal=False).cells, 625)
+        self.assertEqual(len(get_topology(5, diagonal=False).unitlist), 75)
+        self.assertRaises(ValueError, get_topology, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,17 @@
+"""Board constants under the lowercase names used by function.py.
+
+function.py is the earlier, dictionary-only copy of the solver; these are
+the same diagonal sudoku tables that solution.py builds.
+"""
+from solution import BOXES as boxes
+from solution import COLUMN_UNITS as column_units
+from solution import DIAGONAL_UNITS as diagonal_units
+from solution import PEERS as peers
+from solution import ROW_UNITS as row_units
+from solution import SQUARE_UNITS as square_units
+from solution import UNITLIST as unitlist
+from solution import UNITS as units
+from solution import cross, display
+
+rows = 'ABCDEFGHI'
+cols = '123456789'
@@ -0,0 +1,142 @@
+"""Constraint propagation over many boards at once with NumPy.
+
+Boards are held as an (N, 81) array of the candidate masks used by bitboard.
+Eliminate and only choice run for every board together through fancy
+indexing with the peer and unit index tables below; boards still open after
+propagation are finished one by one with bitboard.search_trail.
+
+NumPy is only needed by this module; the rest of the solver runs without it.
+"""
+import numpy as np
+
+import bitboard
+
+MASK_DTYPE = np.uint16
+ALL_DIGITS = MASK_DTYPE(bitboard.ALL_DIGITS)
+BIT_COUNT = np.array(bitboard.BIT_COUNT, dtype=np.uint8)
+
+# peers of each box, padded with 81: the index of an always-empty box
+_MAX_PEERS = max(len(peers) for peers in bitboard.PEERS)
+PEER_INDEX = np.array([peers + (81,) * (_MAX_PEERS - len(peers))
+                       for peers in bitboard.PEERS], dtype=np.intp)
+# (29, 9) boxes of each unit
+UNIT_INDEX = np.array(bitboard.UNITLIST, dtype=np.intp)
+# units of each box, padded with 29: the index of an always-empty unit
+_MAX_UNITS = max(len(units) for units in bitboard.UNITS)
+BOX_UNIT_INDEX = np.array([units + (len(bitboard.UNITLIST),) * (_MAX_UNITS - len(units))
+                           for units in bitboard.UNITS], dtype=np.intp)
+
+
+def from_grids(grids):
+    """Convert grid strings into an (N, 81) array of candidate masks.
+
+    Raises:
+        ValueError: if a grid does not hold exactly 81 boxes.
+    """
+    rows = []
+    for line, grid in enumerate(grids, 1):
+        grid = ''.join(grid.split())
+        if len(grid) != 81:
+            raise ValueError("Sudoku grid {} is an invalid length".format(line))
+        rows.append(grid)
+    if not rows:
+        return np.zeros((0, 81), dtype=MASK_DTYPE)
+    chars = np.frombuffer(''.join(rows).encode('ascii'), dtype=np.uint8).reshape(-1, 81)
+    digits = chars.astype(np.int16) - ord('0')
+    return _masks(digits, (digits >= 1) & (digits <= 9))
+
+
+def from_digits(digits):
+    """Convert 81 digit codes per board (0 for empty) into an (N, 81) mask array.
+
+    digits is any bytes-like object, such as loader.Puzzles.digits.
+    """
+    digits = np.frombuffer(digits, dtype=np.uint8).reshape(-1, 81).astype(np.int16)
+    return _masks(digits, digits > 0)
+
+
+def _masks(digits, given):
+    shifts = np.where(given, digits - 1, 0).astype(MASK_DTYPE)
+    return np.where(given, MASK_DTYPE(1) << shifts, ALL_DIGITS).astype(MASK_DTYPE)
+
+
+def eliminate(boards):
+    """Remove every solved box's digit from its peers, for all boards."""
+    solved = np.where(BIT_COUNT[boards] == 1, boards, 0).astype(MASK_DTYPE)
+    solved = np.concatenate([solved, np.zeros((len(boards), 1), dtype=MASK_DTYPE)], axis=1)
+    taken = np.bitwise_or.reduce(solved[:, PEER_INDEX], axis=2)
+    return boards & ~taken
+
+
+def only_choice(boards):
+    """Assign every digit that fits in only one box of a unit, for all boards.
+
+    A box that is the only place for two different digits is set to 0, as
+    is every box of a unit that can no longer hold some digit.
+    """
+    units = boards[:, UNIT_INDEX]
+    once = np.zeros(units.shape[:2], dtype=MASK_DTYPE)
+    twice = np.zeros_like(once)
+    for position in range(units.shape[2]):
+        twice |= once & units[:, :, position]
+        once |= units[:, :, position]
+    singles = once & ~twice
+    # a unit missing a digit forces a contradiction through its own boxes
+    missing = once != ALL_DIGITS
+
+    # append the always-empty padding unit, then gather per box
+    singles = np.concatenate([singles, np.zeros((len(boards), 1), dtype=MASK_DTYPE)], axis=1)
+    missing = np.concatenate([missing, np.zeros((len(boards), 1), dtype=bool)], axis=1)
+    box_singles = np.bitwise_or.reduce(singles[:, BOX_UNIT_INDEX], axis=2)
+    box_missing = np.any(missing[:, BOX_UNIT_INDEX], axis=2)
+
+    hits = boards & box_singles
+    assigned = np.where(BIT_COUNT[hits] == 1, hits, 0).astype(MASK_DTYPE)
+    boards = np.where(hits != 0, assigned, boards)
+    return np.where(box_missing, 0, boards).astype(MASK_DTYPE)
+
+
+def propagate_many(boards):
+    """Apply eliminate and only choice to every board until none changes.
+
+    Args:
+        boards: (N, 81) array of candidate masks; not modified.
+    Returns:
+        A new (N, 81) array. Boards with a 0 anywhere are contradictions.
+    """
+    boards = np.array(boards, dtype=MASK_DTYPE)
+    active = np.arange(len(boards))
+    while len(active):
+        before = boards[active]
+        after = only_choice(eliminate(before))
+        boards[active] = after
+        changed = np.any(after != before, axis=1)
+        dead = np.any(after == 0, axis=1)
+        active = active[changed & ~dead]
+    return boards
+
+
+def solve_batch(grids):
+    """Solve many grids, propagating all of them together first.
+
+    Returns:
+        A list holding, for each grid, the dictionary form of its solution
+        or False if it has no solution.
+    """
+    boards = propagate_many(from_grids(grids))
+    dead = np.any(boards == 0, axis=1)
+    solved = np.all(BIT_COUNT[boards] == 1, axis=1)
+
+    results = []
+    for board, is_dead, is_solved in zip(boards.tolist(), dead, solved):
+        if is_dead:
+            results.append(False)
+            continue
+        if not is_solved:
+            board = bitboard.search_trail(board)
+            if board is False:
+                results.append(False)
+                continue
+        results.append(bitboard.to_values(board))
+    return results
+
@@ -0,0 +1,32 @@
+import unittest
+
+import solution_test
+
+try:
+    import vectorized
+except ImportError:
+    vectorized = None
+
+
+@unittest.skipIf(vectorized is None, "NumPy is not installed")
+class TestSolveBatch(unittest.TestCase):
+    diagonal = solution_test.TestDiagonalSudoku
+
+    def test_solve_batch(self):
+        grids = [self.diagonal.diagonal_grid, '11' + '.' * 79, '2' + '.' * 80]
+        results = vectorized.solve_batch(grids)
+        self.assertEqual(results[0], self.diagonal.solved_diag_sudoku)
+        self.assertFalse(results[1])
+        self.assertEqual(results[2]['A1'], '2')
+        self.assertTrue(all(len(value) == 1 for value in results[2].values()))
+
+    def test_propagate_many_matches_bitboard(self):
+        boards = vectorized.from_grids([self.diagonal.diagonal_grid])
+        propagated = vectorized.propagate_many(boards)
+        solved = vectorized.from_grids([''.join(self.diagonal.solved_diag_sudoku[box]
+                                                for box in solution_test.solution.BOXES)])
+        self.assertTrue((propagated == solved).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,61 @@
 from PySudoku import play
 
-def visualize_assignments(assignments):
-    """ Visualizes the set of assignments created by the Sudoku AI"""
-    last_assignment = None
-    filtered_assignments = []
-
-    for i in range(len(assignments)):
-        if last_assignment:
-            last_assignment_items = [item for item in last_assignment.items() if len(item[1]) == 1]
-            current_assignment_items = [item for item in assignments[i].items() if len(item[1]) == 1]
-            shared_items = set(last_assignment_items) & set(current_assignment_items)
-            if len(shared_items) < len(current_assignment_items):
-                filtered_assignments.append(assignments[i])
-        last_assignment = assignments[i]
-
-    play(filtered_assignments)
+from solution import BOXES, trace_changes
+
+
+def board_changes(boards):
+    """Turn boards in dictionary form into (state, before) deltas.
+
+    Used for plain iterables of boards, which do not record what changed;
+    each board is compared with the previous one box by box.
+    """
+    state = None
+    for values in boards:
+        current = [values[box] for box in BOXES]
+        if state is None:
+            before = {i: None for i in range(len(current))}
+        else:
+            before = {i: old for i, old in enumerate(state) if old != current[i]}
+        state = current
+        yield state, before
+
+
+def _trace_file_changes(path):
+    with open(path) as stream:
+        for change in trace_changes(stream):
+            yield change
+
+
+def replay_changes(assignments):
+    """Return the (state, before) deltas of any source visualize accepts."""
+    if hasattr(assignments, 'changes'):
+        return assignments.changes()
+    if isinstance(assignments, str):
+        return _trace_file_changes(assignments)
+    if hasattr(assignments, 'readline'):
+        return trace_changes(assignments)
+    return board_changes(assignments)
+
+
+def new_assignments(changes):
+    """Yield a board for each delta that gives some box a new single value.
+
+    Only the boxes in the delta are looked at, and each board is built as
+    it is yielded, so the frames can be consumed one at a time.
+    """
+    for state, before in changes:
+        if any(len(state[i]) == 1 and state[i] != old for i, old in before.items()):
+            yield dict(zip(BOXES, state))
+
+
+def visualize_assignments(assignments, output_dir=None, **options):
+    """ Visualizes the set of assignments created by the Sudoku AI
+
+    assignments is a solution.Trace, an open trace file or the path of one
+    written by Trace(stream=...), or any iterable of boards in dictionary
+    form. Frames are decoded, filtered and drawn one at a time, so a long
+    trace replays in constant memory. With output_dir the frames are
+    written there as images instead of shown; options (fps, image_format)
+    are passed on to PySudoku.play.
+    """
+    return play(new_assignments(replay_changes(assignments)), output_dir, **options)
@@ -0,0 +1,43 @@
+import io
+import unittest
+
+import solution
+import solution_test
+
+try:
+    import visualize
+except ImportError:
+    visualize = None
+
+
+@unittest.skipIf(visualize is None, "pygame is not installed")
+class TestReplay(unittest.TestCase):
+    grid = solution_test.TestTrace.sparse_grid
+
+    def test_sources_agree(self):
+        trace = solution.Trace()
+        solution.solve(self.grid, engine='dict', trace=trace)
+        stream = io.StringIO()
+        solution.solve(self.grid, engine='dict', trace=solution.Trace(stream=stream))
+        stream.seek(0)
+
+        shown = list(visualize.new_assignments(visualize.replay_changes(trace)))
+        self.assertEqual(list(visualize.new_assignments(visualize.replay_changes(trace.frames()))), shown)
+        self.assertEqual(list(visualize.new_assignments(visualize.replay_changes(stream))), shown)
+        self.assertEqual(shown[0]['A1'], '2')
+
+    def test_skips_frames_without_new_values(self):
+        state = ['1'] + ['123'] * 80
+        # box 0 set to the value it had, box 1 narrowed but open, box 0 newly solved
+        changes = [(state, {0: '1'}), (state, {1: '1234'}), (state, {0: '12'})]
+        self.assertEqual(len(list(visualize.new_assignments(changes))), 1)
+
+    def test_changes_share_state(self):
+        trace = solution.Trace()
+        solution.solve(self.grid, engine='dict', trace=trace)
+        states = {id(state) for state, _ in trace.changes()}
+        self.assertEqual(len(states), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()